@@ -0,0 +1,34 @@
+from typing import Callable, List, NamedTuple
+import structlog
+
+logger = structlog.get_logger()
+
+
+class KnowledgeChange(NamedTuple):
+    """A committed write to a knowledge-base table"""
+    entity: str  # faq|product
+    entity_id: int
+    deleted: bool = False
+
+
+_listeners: List[Callable[[KnowledgeChange], None]] = []
+
+
+def subscribe(listener: Callable[[KnowledgeChange], None]):
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def unsubscribe(listener: Callable[[KnowledgeChange], None]):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def emit(entity: str, entity_id: int, deleted: bool = False):
+    """Notify listeners of a change; called by repos after the commit succeeds"""
+    change = KnowledgeChange(entity, entity_id, deleted)
+    for listener in list(_listeners):
+        try:
+            listener(change)
+        except Exception as e:
+            logger.error(f"Error handling {entity} {entity_id} change: {e}")
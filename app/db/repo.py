@@ -4,6 +4,7 @@ from datetime import datetime
 import json
 
 from app.db.models import Message, FAQ, Product, Order, Doc, Setting, Conversation
+from app.db import events
 
 
 class MessageRepo:
@@ -36,8 +37,19 @@ class FAQRepo:
         self.session.add(faq)
         self.session.commit()
         self.session.refresh(faq)
+        events.emit("faq", faq.id)
         return faq
     
+    def create_many(self, faqs: List[FAQ]) -> int:
+        """Insert many FAQs in a single transaction"""
+        self.session.add_all(faqs)
+        self.session.flush()
+        ids = [faq.id for faq in faqs]  # read before commit expires them
+        self.session.commit()
+        for faq_id in ids:
+            events.emit("faq", faq_id)
+        return len(faqs)
+    
     def get_all(self, active_only: bool = True) -> List[FAQ]:
         statement = select(FAQ)
         if active_only:
@@ -51,6 +63,7 @@ class FAQRepo:
                 setattr(faq, key, value)
             self.session.commit()
             self.session.refresh(faq)
+            events.emit("faq", faq_id)
         return faq
     
     def delete(self, faq_id: int) -> bool:
@@ -58,6 +71,7 @@ class FAQRepo:
         if faq:
             self.session.delete(faq)
             self.session.commit()
+            events.emit("faq", faq_id, deleted=True)
             return True
         return False
 
@@ -70,6 +84,7 @@ class ProductRepo:
         self.session.add(product)
         self.session.commit()
         self.session.refresh(product)
+        events.emit("product", product.id)
         return product
     
     def get_all(self, available_only: bool = True) -> List[Product]:
@@ -92,6 +107,7 @@ class ProductRepo:
                 setattr(product, key, value)
             self.session.commit()
             self.session.refresh(product)
+            events.emit("product", product_id)
         return product
     
     def delete(self, product_id: int) -> bool:
@@ -99,6 +115,7 @@ class ProductRepo:
         if product:
             self.session.delete(product)
             self.session.commit()
+            events.emit("product", product_id, deleted=True)
             return True
         return False
 
@@ -140,8 +157,19 @@ class ProductRepo:
         self.session.add(product)
         self.session.commit()
         self.session.refresh(product)
+        events.emit("product", product.id)
         return product
     
+    def create_many(self, products: List[Product]) -> int:
+        """Insert many products in a single transaction"""
+        self.session.add_all(products)
+        self.session.flush()
+        ids = [product.id for product in products]  # read before commit expires them
+        self.session.commit()
+        for product_id in ids:
+            events.emit("product", product_id)
+        return len(products)
+    
     def get_all(self, available_only: bool = True) -> List[Product]:
         statement = select(Product)
         if available_only:
@@ -162,6 +190,7 @@ class ProductRepo:
                 setattr(product, key, value)
             self.session.commit()
             self.session.refresh(product)
+            events.emit("product", product_id)
         return product
     
     def delete(self, product_id: int) -> bool:
@@ -169,6 +198,7 @@ class ProductRepo:
         if product:
             self.session.delete(product)
             self.session.commit()
+            events.emit("product", product_id, deleted=True)
             return True
         return False
 
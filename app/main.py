@@ -2,12 +2,17 @@ from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import structlog
 from pathlib import Path
 
 from app.settings import settings, config
 from app.db.models import create_db_and_tables
+from app.services.rag import rag_service
+from app.services.nlu import nlu_service
+from app.services import knowledge_seed
 from app.routes import ui, api, webhook_web, webhook_twilio, webhook_telegram
 
 
@@ -28,14 +33,33 @@ structlog.configure(
 logger = structlog.get_logger()
 
 
+def warmup():
+    """Load the index and embedding model, then fit the intent classifier with it"""
+    result = rag_service.warmup()
+    nlu_service.fit_classifier()
+    return result
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Customer Service AI Agent Dashboard")
     create_db_and_tables()
+    # FAQs and menu are indexed from the database; the first run copies the seed CSVs into it,
+    # and an index built from the CSVs beforehand is rebuilt so its documents get database keys
+    if any(knowledge_seed.import_seed_data().values()):
+        rag_service.start_rebuild()
+    # Load the index and model and fit the intent classifier off the event loop; /readyz reports when done
+    app.state.rag_warmup = asyncio.create_task(asyncio.to_thread(warmup))
+    if config.get("retrieval", {}).get("sync", {}).get("enabled", True):
+        from app.services.kb_sync import knowledge_sync
+        knowledge_sync.start()
     yield
     # Shutdown
     logger.info("Shutting down")
+    if config.get("retrieval", {}).get("sync", {}).get("enabled", True):
+        knowledge_sync.stop()
+    await asyncio.to_thread(rag_service.flush)
 
 
 app = FastAPI(
@@ -74,6 +98,18 @@ async def health_check():
     return {"status": "ok", "business": config["business"]["name"]}
 
 
+@app.get("/readyz")
+async def readiness_check():
+    """200 once the RAG index and model are warm, 503 while a fresh worker is still loading"""
+    if not rag_service.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {
+        "status": "ready",
+        "warmup_seconds": rag_service.warmup_seconds,
+        "degraded": rag_service.warmup_error
+    }
+
+
 @app.get("/")
 async def root(request: Request):
     return templates.TemplateResponse(
@@ -10,6 +10,7 @@ from app.db.repo import MessageRepo, FAQRepo, ProductRepo, OrderRepo, DocRepo, S
 from app.db.models import Message, FAQ, Product, Order, Doc, Conversation
 from app.services.responder import response_orchestrator
 from app.services.rag import rag_service
+from app.services.llm import llm_service
 from app.settings import config
 
 logger = structlog.get_logger()
@@ -68,21 +69,39 @@ async def chat(request: ChatRequest, session: Session = Depends(get_session)):
 @router.get("/search")
 async def search_rag(q: str, top_k: int = 4):
     """RAG search endpoint for debugging"""
-    results = rag_service.search(q, top_k=top_k)
-    return {"query": q, "hits": results}
+    results = await rag_service.asearch(q, top_k=top_k)
+    return {"query": q, "hits": [hit.to_dict() for hit in results]}
 
 
-@router.post("/rebuild-index")
+@router.get("/rag/stats")
+async def rag_stats():
+    """Query and answer cache hit/miss counters for monitoring"""
+    stats = rag_service.cache_stats()
+    if llm_service.answer_cache is not None:
+        stats["answer_cache"] = llm_service.answer_cache.stats()
+    return stats
+
+
+@router.post("/rebuild-index", status_code=202)
 async def rebuild_index():
-    """Rebuild the RAG index"""
+    """Start a background rebuild of the RAG index"""
     try:
-        stats = rag_service.rebuild_index()
-        return {"success": True, "stats": stats}
+        job = rag_service.start_rebuild()
+        return {"success": True, "job_id": job.job_id, "job": job.to_dict()}
     except Exception as e:
-        logger.error(f"Error rebuilding index: {e}")
+        logger.error(f"Error starting index rebuild: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/rebuild-index/{job_id}")
+async def rebuild_index_status(job_id: str):
+    """Status and progress of a background index rebuild"""
+    job = rag_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Rebuild job not found")
+    return job.to_dict()
+
+
 # FAQ endpoints
 @router.get("/faqs")
 async def get_faqs(session: Session = Depends(get_session)):
@@ -3,7 +3,6 @@ from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlmodel import Session
 from typing import Optional, List
-import csv
 import json
 from pathlib import Path
 import structlog
@@ -12,6 +11,7 @@ from app.deps import get_session
 from app.db.repo import MessageRepo, FAQRepo, ProductRepo, OrderRepo, DocRepo, ConversationRepo
 from app.db.models import FAQ, Product, Order, Doc
 from app.services.rag import rag_service
+from app.services.knowledge_seed import faqs_from_csv
 from app.settings import config, settings, get_dynamic_config
 
 logger = structlog.get_logger()
@@ -132,20 +132,8 @@ async def upload_faq_csv(request: Request, file: UploadFile = File(...), session
         # Also import to database
         faq_repo = FAQRepo(session)
         
-        # Parse CSV and create FAQ records
-        content_str = content.decode('utf-8')
-        reader = csv.DictReader(content_str.splitlines())
-        
-        imported_count = 0
-        for row in reader:
-            if row.get('question') and row.get('answer'):
-                faq = FAQ(
-                    question=row['question'],
-                    answer=row['answer'],
-                    tags=row.get('tags', '')
-                )
-                faq_repo.create(faq)
-                imported_count += 1
+        # Parse CSV and create FAQ records in one transaction
+        imported_count = faq_repo.create_many(faqs_from_csv(content))
         
         return RedirectResponse(
             url=f"/admin/knowledge?message=Imported {imported_count} FAQs successfully",
@@ -270,11 +258,11 @@ async def settings_page(request: Request):
 
 @router.post("/admin/rebuild-index")
 async def rebuild_index_endpoint(request: Request):
-    """Rebuild RAG index endpoint"""
+    """Start a background rebuild of the RAG index"""
     try:
-        stats = rag_service.rebuild_index()
+        job = rag_service.start_rebuild()
         return RedirectResponse(
-            url=f"/admin/knowledge?message=Index rebuilt: {stats['faqs']} FAQs, {stats['menu']} menu items, {stats['docs']} documents",
+            url=f"/admin/knowledge?message=Index rebuild started (job {job.job_id})",
             status_code=303
         )
     except Exception as e:
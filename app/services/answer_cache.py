@@ -0,0 +1,94 @@
+import time
+import itertools
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class SemanticAnswerCache:
+    """LLM replies reused for paraphrased questions that retrieved the same context
+
+    Entries are grouped by the ids of the RAG documents that went into the prompt;
+    a lookup only compares against entries with the same context, and hits when the
+    cosine similarity of the (normalized) query embeddings reaches the threshold.
+    Entries expire after ttl_seconds and the least recently used are evicted past
+    max_size. Everything is dropped when the knowledge-base version changes.
+    """
+
+    def __init__(self, threshold: float = 0.92, max_size: int = 1000, ttl_seconds: float = 3600):
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[Hashable, np.ndarray, Dict[str, Any], float]]" = OrderedDict()
+        self._by_context: Dict[Hashable, List[int]] = {}
+        self._ids = itertools.count()
+        self._version: Any = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, embedding: np.ndarray, context: Hashable, version: Any = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._check_version(version)
+            now = time.monotonic()
+            best_id, best_score = None, self.threshold
+            for entry_id in list(self._by_context.get(context, ())):
+                _, vector, _, created = self._entries[entry_id]
+                if now - created > self.ttl:
+                    self._drop(entry_id)
+                    continue
+                score = float(np.dot(vector, embedding))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id][2]
+
+    def put(self, embedding: np.ndarray, context: Hashable, reply: Dict[str, Any], version: Any = None):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            entry_id = next(self._ids)
+            self._entries[entry_id] = (context, np.asarray(embedding, dtype='float32'), reply, time.monotonic())
+            self._by_context.setdefault(context, []).append(entry_id)
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_context.clear()
+
+    def _check_version(self, version: Any):
+        if version != self._version:
+            self._entries.clear()
+            self._by_context.clear()
+            self._version = version
+
+    def _drop(self, entry_id: int):
+        context = self._entries.pop(entry_id)[0]
+        ids = self._by_context.get(context)
+        if ids is not None:
+            ids.remove(entry_id)
+            if not ids:
+                del self._by_context[context]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,168 @@
+import re
+import math
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+# A sentence ends at . ! ? or … followed by whitespace and something that can start one
+SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s+(?=[¿¡\"'(\[«]?[A-ZÁÉÍÓÚÑÜ0-9])")
+PIECE_RE = re.compile(r"\w+|[^\w\s]")
+MAX_PENDING_CHARS = 20000  # text without any sentence end is cut here
+SPECIAL_TOKENS = 2  # [CLS] and [SEP] count against the model's limit
+
+
+@lru_cache(maxsize=4)
+def token_counter(model_name: str) -> Callable[[str], int]:
+    """Count tokens with the model's own tokenizer, or estimate when it is not available
+
+    Cached per process, so each ingestion worker loads the tokenizer once.
+    """
+    try:
+        from transformers import AutoTokenizer
+        repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        tokenizer = AutoTokenizer.from_pretrained(repo)
+        return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+    except Exception as e:
+        logger.warning(f"Tokenizer for {model_name} unavailable, estimating token counts: {e}")
+        return estimate_tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """WordPiece-style estimate: punctuation is one token, long words split every ~5 characters"""
+    return sum(max(1, math.ceil(len(piece) / 5)) for piece in PIECE_RE.findall(text))
+
+
+def iter_sentences(pages: Iterable[str]) -> Iterator[Tuple[str, bool]]:
+    """Yield (sentence, ends_paragraph) from streamed text, buffering only the unfinished sentence"""
+    pending = ""
+    for page in pages:
+        pending += page
+        paragraphs = PARAGRAPH_RE.split(pending)
+        for paragraph in paragraphs[:-1]:
+            yield from _paragraph_sentences(paragraph)
+        # The last paragraph may continue on the next page: emit only its finished sentences
+        sentences = SENTENCE_END_RE.split(paragraphs[-1])
+        for sentence in sentences[:-1]:
+            sentence = ' '.join(sentence.split())
+            if sentence:
+                yield sentence, False
+        pending = sentences[-1]
+        if len(pending) > MAX_PENDING_CHARS:
+            cut = pending.rfind(" ", 0, MAX_PENDING_CHARS)
+            cut = cut if cut > 0 else MAX_PENDING_CHARS
+            yield ' '.join(pending[:cut].split()), False
+            pending = pending[cut:]
+    yield from _paragraph_sentences(pending)
+
+
+def _paragraph_sentences(paragraph: str) -> Iterator[Tuple[str, bool]]:
+    sentences = [' '.join(s.split()) for s in SENTENCE_END_RE.split(paragraph)]
+    sentences = [s for s in sentences if s]
+    for i, sentence in enumerate(sentences):
+        yield sentence, i == len(sentences) - 1
+
+
+def _split_long(sentence: str, budget: int, count: Callable[[str], int]) -> Iterator[Tuple[str, int]]:
+    """Break a sentence longer than the budget at word boundaries"""
+    words, used = [], 0
+    for word in sentence.split():
+        tokens = count(word)
+        if words and used + tokens > budget:
+            yield ' '.join(words), used
+            words, used = [], 0
+        words.append(word)
+        used += tokens
+    if words:
+        yield ' '.join(words), used
+
+
+def iter_sentence_chunks(
+    pages: Iterable[str],
+    max_tokens: int = 256,
+    overlap_tokens: int = 0,
+    count: Callable[[str], int] = estimate_tokens
+) -> Iterator[str]:
+    """Pack whole sentences into chunks that fit the model's token limit
+
+    A chunk that overflows is cut at its last paragraph end when that keeps it at
+    least half full, otherwise after its last whole sentence. With overlap_tokens,
+    the next chunk repeats trailing sentences of the previous one up to that size.
+    """
+    budget = max(8, max_tokens - SPECIAL_TOKENS)
+    current: List[Tuple[str, int, bool]] = []  # (sentence, tokens, ends_paragraph)
+    used = 0
+
+    def render(parts):
+        text = ""
+        for sentence, _, ends_paragraph in parts:
+            text += sentence + ("\n\n" if ends_paragraph else " ")
+        return text.strip()
+
+    def carry_over(parts):
+        kept, size = [], 0
+        for part in reversed(parts):
+            if size + part[1] > overlap_tokens:
+                break
+            kept.insert(0, part)
+            size += part[1]
+        return kept
+
+    for sentence, ends_paragraph in iter_sentences(pages):
+        tokens = count(sentence)
+        pieces = [(sentence, tokens)] if tokens <= budget else list(_split_long(sentence, budget, count))
+        for i, (piece, piece_tokens) in enumerate(pieces):
+            part = (piece, piece_tokens, ends_paragraph and i == len(pieces) - 1)
+            if current and used + piece_tokens > budget:
+                cut = len(current)
+                running = 0
+                for j, (_, size, paragraph_end) in enumerate(current):
+                    running += size
+                    if paragraph_end and running >= budget // 2 and j < len(current) - 1:
+                        cut = j + 1
+                emitted, rest = current[:cut], current[cut:]
+                yield render(emitted)
+                if rest and sum(size for _, size, _ in rest) + piece_tokens > budget:
+                    # What followed the paragraph cut can't share a chunk with this piece
+                    yield render(rest)
+                    emitted, rest = rest, []
+                carried = carry_over(emitted) if overlap_tokens else []
+                used = sum(size for _, size, _ in carried + rest)
+                # Overlap never pushes a chunk past the budget: drop the oldest carried sentences
+                while carried and used + piece_tokens > budget:
+                    used -= carried.pop(0)[1]
+                current = carried + rest
+            current.append(part)
+            used += piece_tokens
+
+    if current:
+        yield render(current)
+
+
+def iter_chunks(pages: Iterable[str], chunk_size: int = 300, overlap: int = 50) -> Iterator[str]:
+    """Split streamed text into overlapping word windows, holding at most one window in memory"""
+    step = max(1, chunk_size - overlap)
+    window: List[str] = []
+    for page in pages:
+        window.extend(page.split())
+        while len(window) >= chunk_size:
+            yield ' '.join(window[:chunk_size])
+            del window[:step]
+    # Same tail windows as slicing the whole word list every `step` words
+    while window:
+        yield ' '.join(window[:chunk_size])
+        del window[:step]
+
+
+def chunk_stream(pages: Iterable[str], chunking: Dict[str, Any]) -> Iterator[str]:
+    """Chunk streamed text with the configured strategy ("sentence" or legacy "words")"""
+    if chunking.get("strategy", "sentence") == "words":
+        return iter_chunks(pages, chunking.get("chunk_size", 300), chunking.get("overlap", 50))
+    return iter_sentence_chunks(
+        pages,
+        chunking.get("max_tokens", 256),
+        chunking.get("overlap_tokens", 0),
+        token_counter(chunking.get("model_name", "all-MiniLM-L6-v2"))
+    )
@@ -0,0 +1,146 @@
+import os
+import mmap
+import json
+import numpy as np
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+from pathlib import Path
+import structlog
+
+logger = structlog.get_logger()
+
+
+class DocStore(MutableMapping):
+    """Documents keyed by id, read lazily from a memory-mapped payload file
+
+    On disk the store is two files:
+      - documents.bin: each document as compact UTF-8 JSON, back to back
+      - documents.idx.npy: an (n, 3) int64 table of (id, offset, length), sorted by id
+    Opening maps both files, so startup cost does not grow with the corpus and only
+    the documents a query returns are ever decoded. Edits made after opening live in
+    an in-memory overlay until the store is written again.
+    """
+
+    PAYLOAD_FILE = "documents.bin"
+    TABLE_FILE = "documents.idx.npy"
+
+    def __init__(self):
+        self._table = np.zeros((0, 3), dtype='int64')
+        self._ids = self._table[:, 0]
+        self._payload: Optional[mmap.mmap] = None
+        self._overlay: Dict[int, Dict[str, Any]] = {}
+        self._deleted: Set[int] = set()
+        self._added = 0  # overlay entries whose id is not in the table
+
+    @classmethod
+    def exists(cls, directory: Path) -> bool:
+        return (directory / cls.PAYLOAD_FILE).exists() and (directory / cls.TABLE_FILE).exists()
+
+    @classmethod
+    def open(cls, directory: Path) -> "DocStore":
+        store = cls()
+        store._table = np.load(directory / cls.TABLE_FILE, mmap_mode='r')
+        store._ids = store._table[:, 0]
+        with open(directory / cls.PAYLOAD_FILE, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                store._payload = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return store
+
+    @classmethod
+    def write(cls, directory: Path, documents: Iterable[Tuple[int, Dict[str, Any]]]) -> int:
+        """Write documents to disk, replacing any previous store atomically"""
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_payload = directory / (cls.PAYLOAD_FILE + ".tmp")
+        tmp_table = directory / ("tmp." + cls.TABLE_FILE)
+
+        rows = []
+        offset = 0
+        with open(tmp_payload, 'wb') as f:
+            for doc_id, doc in documents:
+                data = doc if isinstance(doc, bytes) else json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                f.write(data)
+                rows.append((doc_id, offset, len(data)))
+                offset += len(data)
+
+        table = np.array(rows, dtype='int64').reshape(-1, 3)
+        table = table[np.argsort(table[:, 0], kind='stable')]
+        np.save(tmp_table, table)
+
+        # Readers keep their mapping of the old files until they reopen
+        os.replace(tmp_payload, directory / cls.PAYLOAD_FILE)
+        os.replace(tmp_table, directory / cls.TABLE_FILE)
+        return len(rows)
+
+    def encoded_items(self) -> Iterator[Tuple[int, bytes]]:
+        """(id, encoded document) pairs for write(), copying unchanged documents without decoding"""
+        for row, doc_id in enumerate(self._ids):
+            doc_id = int(doc_id)
+            if doc_id not in self._deleted and doc_id not in self._overlay:
+                _, offset, length = self._table[row]
+                yield doc_id, self._payload[offset:offset + length]
+        for doc_id, doc in list(self._overlay.items()):
+            yield doc_id, json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def copy(self) -> "DocStore":
+        """An independent store sharing the mapped files, for writing while this one changes"""
+        store = DocStore()
+        store._table, store._ids, store._payload = self._table, self._ids, self._payload
+        store._overlay = dict(self._overlay)
+        store._deleted = set(self._deleted)
+        store._added = self._added
+        return store
+
+    def _row(self, doc_id: int) -> int:
+        """Row of doc_id in the on-disk table, or -1"""
+        pos = int(np.searchsorted(self._ids, doc_id))
+        if pos < len(self._ids) and self._ids[pos] == doc_id:
+            return pos
+        return -1
+
+    def _decode(self, row: int) -> Dict[str, Any]:
+        _, offset, length = self._table[row]
+        return json.loads(self._payload[offset:offset + length])
+
+    def __getitem__(self, doc_id: int) -> Dict[str, Any]:
+        doc = self._overlay.get(doc_id)
+        if doc is not None:
+            return doc
+        if doc_id not in self._deleted:
+            row = self._row(doc_id)
+            if row >= 0:
+                return self._decode(row)
+        raise KeyError(doc_id)
+
+    def __contains__(self, doc_id) -> bool:
+        if doc_id in self._overlay:
+            return True
+        return doc_id not in self._deleted and self._row(doc_id) >= 0
+
+    def __setitem__(self, doc_id: int, doc: Dict[str, Any]):
+        if doc_id not in self._overlay and self._row(doc_id) < 0:
+            self._added += 1
+        self._overlay[doc_id] = doc
+        self._deleted.discard(doc_id)
+
+    def __delitem__(self, doc_id: int):
+        in_table = self._row(doc_id) >= 0
+        if doc_id in self._overlay:
+            del self._overlay[doc_id]
+            if not in_table:
+                self._added -= 1
+        elif not in_table or doc_id in self._deleted:
+            raise KeyError(doc_id)
+        if in_table:
+            self._deleted.add(doc_id)
+
+    def __iter__(self) -> Iterator[int]:
+        for doc_id in self._ids:
+            doc_id = int(doc_id)
+            if doc_id not in self._deleted or doc_id in self._overlay:
+                yield doc_id
+        for doc_id in list(self._overlay):
+            if self._row(doc_id) < 0:
+                yield doc_id
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._deleted) + self._added
@@ -0,0 +1,77 @@
+import os
+from typing import Any, Dict
+import structlog
+
+logger = structlog.get_logger()
+
+BACKENDS = ("torch", "onnx")
+ONNX_FILES = {
+    # Files published alongside sentence-transformers models on the Hugging Face hub
+    "float32": "onnx/model.onnx",
+    "int8": "onnx/model_quint8_avx2.onnx"
+}
+
+
+def embedding_threads(embedding_config: Dict[str, Any]) -> int:
+    """Intra-op threads for the encoder (0 = library default, usually one per core)"""
+    return int(embedding_config.get("threads", 0) or 0)
+
+
+def embedding_variant(model_name: str, embedding_config: Dict[str, Any]) -> str:
+    """Name for the vectors a configuration produces; non-default backends get their own cache entries"""
+    backend = embedding_config.get("backend", "torch")
+    quantize = embedding_config.get("quantize", "none")
+    if backend == "torch" and quantize == "none":
+        return model_name
+    return f"{model_name}+{backend}-{quantize}"
+
+
+def load_embedding_model(model_name: str, embedding_config: Dict[str, Any]):
+    """Load a SentenceTransformer on the configured CPU backend
+
+    torch runs the PyTorch model, optionally with int8 dynamic quantization of its
+    Linear layers; onnx runs an exported graph (float32 or int8) on ONNX Runtime.
+    Every backend returns the same SentenceTransformer object, so encode() and the
+    pooling / normalization modules behave identically to the default.
+    """
+    threads = embedding_threads(embedding_config)
+    if threads:
+        # Cap OpenMP / BLAS pools too; only effective before torch is first imported
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ.setdefault(var, str(threads))
+    from sentence_transformers import SentenceTransformer
+
+    backend = embedding_config.get("backend", "torch")
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown embedding backend '{backend}', using torch")
+        backend = "torch"
+    quantize = embedding_config.get("quantize", "none")
+
+    if backend == "onnx":
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        file_name = embedding_config.get("onnx_file") or ONNX_FILES["int8" if quantize == "int8" else "float32"]
+        model = SentenceTransformer(
+            model_name,
+            device="cpu",
+            backend="onnx",
+            model_kwargs={"file_name": file_name, "provider": "CPUExecutionProvider", "session_options": options}
+        )
+        logger.info(f"Loaded {model_name} on ONNX Runtime ({file_name}, threads={threads or 'default'})")
+        return model
+
+    import torch
+
+    if threads:
+        torch.set_num_threads(threads)
+    model = SentenceTransformer(model_name, device=embedding_config.get("device"))
+    if quantize == "int8":
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+    logger.info(f"Loaded {model_name} on PyTorch (quantize={quantize}, threads={threads or 'default'})")
+    return model
+
@@ -0,0 +1,137 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional
+from pathlib import Path
+import structlog
+
+logger = structlog.get_logger()
+
+
+class EmbeddingCache:
+    """Persistent cache of document embeddings keyed by a hash of model name and text
+
+    Safe to share between threads (a rebuild encoding while a sync saves): the lock
+    covers lookups and the pending dict, not the encoder call or the file writes.
+    """
+
+    def __init__(self, cache_dir: Path, model_name: str):
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.vectors_file = cache_dir / "vectors.npy"
+        self.keys_file = cache_dir / "keys.json"
+
+        self._rows: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._pending: Dict[str, np.ndarray] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()  # one save at a time, outside _lock
+
+    def content_hash(self, text: str) -> str:
+        """Hash identifying one text under the current model"""
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def load(self):
+        """Load cached vectors from disk (done lazily on first use)"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+    def _load(self):
+        self._loaded = True
+        try:
+            if self.vectors_file.exists() and self.keys_file.exists():
+                with open(self.keys_file, 'r', encoding='utf-8') as f:
+                    keys = json.load(f)
+                vectors = np.load(self.vectors_file)
+                if len(keys) == len(vectors):
+                    self._rows = {key: row for row, key in enumerate(keys)}
+                    self._vectors = vectors
+                    logger.info(f"Loaded embedding cache with {len(keys)} vectors")
+                else:
+                    logger.warning("Embedding cache is inconsistent, ignoring it")
+        except Exception as e:
+            logger.error(f"Error loading embedding cache: {e}")
+            self._rows = {}
+            self._vectors = None
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if key in self._pending:
+                return self._pending[key]
+            row = self._rows.get(key)
+            if row is not None:
+                return self._vectors[row]
+            return None
+
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Return embeddings for texts, calling encode_fn only for texts not cached yet"""
+        keys = [self.content_hash(text) for text in texts]
+        with self._lock:
+            cached = [self.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+
+        if missing:
+            # Encode each distinct missing text once, without holding the lock
+            unique = {}
+            for i in missing:
+                unique.setdefault(keys[i], texts[i])
+            encoded = dict(zip(unique.keys(), encode_fn(list(unique.values()))))
+            with self._lock:
+                self._pending.update(encoded)
+            for i in missing:
+                cached[i] = encoded[keys[i]]
+
+        logger.info(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} encoded")
+        if not cached:
+            return np.zeros((0, 0), dtype='float32')
+        return np.ascontiguousarray(np.vstack(cached), dtype='float32')
+
+    def save(self, keep: Optional[Iterable[str]] = None):
+        """Persist the cache, optionally dropping entries not listed in keep"""
+        with self._save_lock:
+            self._save(keep)
+
+    def _save(self, keep: Optional[Iterable[str]]):
+        # Take a consistent view; _vectors is replaced on save, never written in place
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            rows, base, pending = dict(self._rows), self._vectors, dict(self._pending)
+
+        keys = list(rows.keys()) + [key for key in pending if key not in rows]
+        if keep is not None:
+            keep = set(keep)
+            keys = [key for key in keys if key in keep]
+
+        if not keys:
+            return
+
+        try:
+            vectors = np.vstack([pending[key] if key in pending else base[rows[key]] for key in keys]).astype('float32')
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            # Write to temporary files and swap them in so a crash never leaves a torn cache
+            tmp_vectors = self.cache_dir / "vectors.tmp.npy"
+            tmp_keys = self.cache_dir / "keys.tmp.json"
+            np.save(tmp_vectors, vectors)
+            with open(tmp_keys, 'w', encoding='utf-8') as f:
+                json.dump(keys, f)
+            os.replace(tmp_vectors, self.vectors_file)
+            os.replace(tmp_keys, self.keys_file)
+
+            # Vectors encoded while writing stay pending for the next save
+            with self._lock:
+                self._rows = {key: row for row, key in enumerate(keys)}
+                self._vectors = vectors
+                for key in pending:
+                    if self._pending.get(key) is pending[key]:
+                        del self._pending[key]
+            logger.info(f"Saved embedding cache with {len(keys)} vectors")
+        except Exception as e:
+            logger.error(f"Error saving embedding cache: {e}")
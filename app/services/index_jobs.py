@@ -0,0 +1,67 @@
+import uuid
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class RebuildJob:
+    """Status and progress of one background index rebuild"""
+
+    def __init__(self):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.status = "pending"  # pending|running|completed|failed
+        self.stage = "queued"  # queued|loading|embedding|indexing|swapping|done
+        self.documents_loaded = 0
+        self.chunks_total = 0
+        self.chunks_embedded = 0
+        self.stats: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("pending", "running")
+
+    def update(self, **fields):
+        with self._lock:
+            for key, value in fields.items():
+                setattr(self, key, value)
+
+    def start(self):
+        self.update(status="running", stage="loading", started_at=datetime.utcnow())
+
+    def finish(self, stats: Dict[str, Any]):
+        status = "failed" if stats.get("error") else "completed"
+        self.update(
+            status=status,
+            stage="done",
+            stats=stats,
+            error=stats.get("error"),
+            finished_at=datetime.utcnow()
+        )
+
+    def fail(self, error: str):
+        self.update(status="failed", stage="done", error=error, finished_at=datetime.utcnow())
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": {
+                    "documents_loaded": self.documents_loaded,
+                    "chunks_total": self.chunks_total,
+                    "chunks_embedded": self.chunks_embedded,
+                    "percent": round(100.0 * self.chunks_embedded / self.chunks_total, 1)
+                    if self.chunks_total else 0.0
+                },
+                "stats": self.stats,
+                "error": self.error,
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None
+            }
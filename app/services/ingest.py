@@ -0,0 +1,90 @@
+import os
+import multiprocessing
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import structlog
+import PyPDF2
+
+from app.services.chunker import chunk_stream
+
+logger = structlog.get_logger()
+
+TEXT_BLOCK_SIZE = 1 << 16  # characters read per step from plain-text files
+
+
+def iter_pages(file_path: str) -> Iterator[str]:
+    """Yield a file's text piece by piece: PDF pages, or blocks of a text file"""
+    path = Path(file_path)
+    suffix = path.suffix.lower()
+    if suffix == '.pdf':
+        with open(path, 'rb') as file:
+            for page in PyPDF2.PdfReader(file).pages:
+                yield (page.extract_text() or "") + "\n"
+    elif suffix in ('.txt', '.md'):
+        with open(path, 'r', encoding='utf-8') as f:
+            carry = ""
+            while True:
+                block = f.read(TEXT_BLOCK_SIZE)
+                if not block:
+                    break
+                # Hold back a trailing partial word so it is not split across blocks
+                block = carry + block
+                cut = max(block.rfind(" "), block.rfind("\n"))
+                if cut < 0:
+                    carry = block
+                    continue
+                carry = block[cut:]
+                yield block[:cut]
+            if carry:
+                yield carry
+    else:
+        logger.warning(f"Unsupported file type: {path.suffix}")
+
+
+def file_chunks(file_path: str, chunking: Dict[str, Any]) -> List[str]:
+    """Chunk texts of one file; runs inside pool workers, so failures are logged, not raised"""
+    try:
+        return list(chunk_stream(iter_pages(file_path), chunking))
+    except Exception as e:
+        logger.error(f"Error loading document from {file_path}: {e}")
+        return []
+
+
+def default_workers() -> int:
+    """Half the CPUs, leaving the rest to request handling when a rebuild runs in the server"""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def ingest_workers(retrieval_config: dict) -> int:
+    return retrieval_config.get("ingest_workers") or default_workers()
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool whose workers are not forked from the (threaded) calling process
+
+    A fork copies only the calling thread, so a lock another thread held at that
+    moment (logging, a DB pool, a BLAS pool) stays locked forever in the child.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def iter_file_chunks(
+    paths: List[str], chunking: Dict[str, Any], workers: Optional[int] = None
+) -> Iterator[Tuple[str, List[str]]]:
+    """Yield (path, chunk texts) per file as soon as it is parsed, in completion order
+
+    Files are parsed in a process pool so PDF extraction runs on several cores; a single
+    file, or a single worker, is parsed in-process to skip the pool start-up.
+    """
+    workers = min(workers or default_workers(), len(paths))
+    if workers <= 1:
+        for path in paths:
+            yield path, file_chunks(path, chunking)
+        return
+
+    with process_pool(workers) as pool:
+        futures = {pool.submit(file_chunks, path, chunking): path for path in paths}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -0,0 +1,65 @@
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+
+class CentroidIntentClassifier:
+    """Nearest-centroid intent classifier over normalized sentence embeddings
+
+    Each intent's centroid is the normalized mean of its labelled examples'
+    embeddings; a query embedding is scored against all centroids with one
+    matrix-vector product and takes the closest intent above min_score.
+    """
+
+    def __init__(self, examples: Dict[str, List[str]], min_score: float = 0.55, margin: float = 0.0):
+        self.examples = {intent: list(texts) for intent, texts in examples.items() if texts}
+        self.min_score = min_score
+        self.margin = margin
+        # (labels, (intents, dim) float32 centroids), swapped as one reference on fit
+        self._fitted: Optional[Tuple[List[str], np.ndarray]] = None
+
+    @property
+    def dim(self) -> Optional[int]:
+        """Embedding size the centroids were fitted with, None before fit"""
+        return None if self._fitted is None else self._fitted[1].shape[1]
+
+    def fit(self, encode: Callable[[List[str]], np.ndarray]):
+        """Embed every example in one batch and average them per intent"""
+        labels = list(self.examples)
+        texts = [text for intent in labels for text in self.examples[intent]]
+        if not texts:
+            return
+        embeddings = np.asarray(encode(texts), dtype='float32')
+
+        centroids, start = [], 0
+        for intent in labels:
+            count = len(self.examples[intent])
+            centroid = embeddings[start:start + count].mean(axis=0)
+            centroids.append(centroid / (np.linalg.norm(centroid) or 1.0))
+            start += count
+        self._fitted = (labels, np.ascontiguousarray(np.vstack(centroids), dtype='float32'))
+        logger.info(f"Fitted intent centroids for {len(labels)} intents from {len(texts)} examples")
+
+    def scores(self, embedding: np.ndarray) -> Dict[str, float]:
+        if self._fitted is None:
+            return {}
+        labels, centroids = self._fitted
+        return dict(zip(labels, (centroids @ embedding).tolist()))
+
+    def classify(self, embedding: np.ndarray) -> Optional[Tuple[str, float]]:
+        """Closest intent and its cosine similarity, or None below min_score/margin"""
+        if self._fitted is None or embedding is None:
+            return None
+        labels, centroids = self._fitted
+        if embedding.shape[-1] != centroids.shape[1]:
+            return None
+        scores = centroids @ embedding
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score < self.min_score:
+            return None
+        if self.margin and len(scores) > 1 and score - float(np.partition(scores, -2)[-2]) < self.margin:
+            return None
+        return labels[best], score
@@ -0,0 +1,126 @@
+import time
+import threading
+from typing import Dict, Tuple
+from sqlmodel import Session
+import structlog
+
+from app.settings import config
+from app.deps import engine
+from app.db import events
+from app.db.models import FAQ, Product
+from app.services.rag import rag_service, faq_key, product_key, faq_document, product_document
+
+logger = structlog.get_logger()
+
+
+class KnowledgeSync:
+    """Applies FAQ and product changes to the RAG index in the background
+
+    Repo writes emit change events; they are collected per row (the latest change
+    wins) and applied once writes have been quiet for debounce_ms, or max_delay_ms
+    after the first pending change, so a burst of edits costs one index update.
+    """
+
+    def __init__(self, rag, debounce_ms: int = 1000, max_delay_ms: int = 5000):
+        self.rag = rag
+        self.debounce = debounce_ms / 1000.0
+        self.max_delay = max_delay_ms / 1000.0
+        self._pending: Dict[Tuple[str, int], bool] = {}  # (entity, id) -> deleted
+        self._first_at = 0.0
+        self._last_at = 0.0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.applied = 0
+
+    def start(self):
+        events.subscribe(self.notify)
+        with self._cond:
+            self._stopped = False
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="rag-knowledge-sync", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        events.unsubscribe(self.notify)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def notify(self, change: events.KnowledgeChange):
+        if change.entity not in ("faq", "product") or change.entity_id is None:
+            return
+        with self._cond:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_at = now
+            self._last_at = now
+            self._pending[(change.entity, change.entity_id)] = change.deleted
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                # Wait out the burst, but never past max_delay from the first change
+                while not self._stopped:
+                    now = time.monotonic()
+                    due = min(self._last_at + self.debounce, self._first_at + self.max_delay)
+                    if now >= due:
+                        break
+                    self._cond.wait(due - now)
+            self.flush()
+
+    def flush(self) -> int:
+        """Apply pending changes now; returns how many rows were synced"""
+        with self._cond:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        upserts, removals = [], []
+        try:
+            with Session(engine) as session:
+                for (entity, entity_id), deleted in pending.items():
+                    if entity == "faq":
+                        faq = None if deleted else session.get(FAQ, entity_id)
+                        if faq is not None and faq.active:
+                            upserts.append(faq_document(faq))
+                        else:
+                            removals.append(faq_key(entity_id))
+                    else:
+                        product = None if deleted else session.get(Product, entity_id)
+                        if product is not None and product.available:
+                            upserts.append(product_document(product))
+                        else:
+                            removals.append(product_key(entity_id))
+
+            if removals:
+                self.rag.remove_documents(removals)
+            if upserts:
+                self.rag.upsert_documents(upserts)
+            self.applied += len(pending)
+            logger.info(f"Synced {len(upserts)} updated and {len(removals)} removed knowledge rows to the index")
+        except Exception as e:
+            logger.error(f"Error syncing knowledge changes: {e}")
+            # Keep the changes for the next attempt unless newer ones replaced them
+            with self._cond:
+                for row, deleted in pending.items():
+                    self._pending.setdefault(row, deleted)
+                self._first_at = self._last_at = time.monotonic()
+            return 0
+        return len(pending)
+
+
+sync_config = config.get("retrieval", {}).get("sync", {})
+knowledge_sync = KnowledgeSync(
+    rag_service,
+    debounce_ms=sync_config.get("debounce_ms", 1000),
+    max_delay_ms=sync_config.get("max_delay_ms", 5000)
+)
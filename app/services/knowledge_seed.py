@@ -0,0 +1,89 @@
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List
+import pandas as pd
+from sqlmodel import Session
+import structlog
+
+from app.deps import engine
+from app.db.models import FAQ, Product
+from app.db.repo import FAQRepo, ProductRepo, SettingRepo
+
+logger = structlog.get_logger()
+
+SEED_FAQS = Path("data/faqs.csv")
+SEED_MENU = Path("data/menu.csv")
+
+
+def _flag(value: str) -> bool:
+    return value.strip().lower() in ("true", "1", "yes", "si", "sí")
+
+
+def faqs_from_csv(content: bytes) -> List[FAQ]:
+    """Build FAQ records from uploaded CSV bytes, skipping rows without question or answer"""
+    df = pd.read_csv(BytesIO(content), dtype=str, keep_default_na=False, encoding='utf-8')
+    if 'question' not in df or 'answer' not in df:
+        return []
+    df = df[(df['question'] != '') & (df['answer'] != '')]
+    tags = df['tags'].tolist() if 'tags' in df else [''] * len(df)
+    return [
+        FAQ(question=question, answer=answer, tags=tag)
+        for question, answer, tag in zip(df['question'].tolist(), df['answer'].tolist(), tags)
+    ]
+
+
+def products_from_csv(content: bytes) -> List[Product]:
+    """Build Product records from menu CSV bytes, skipping rows without name or price
+
+    The CSV's id column is ignored; the database assigns ids.
+    """
+    df = pd.read_csv(BytesIO(content), dtype=str, keep_default_na=False, encoding='utf-8')
+    if 'name' not in df or 'price' not in df:
+        return []
+    df = df[(df['name'] != '') & (df['price'] != '')]
+
+    def column(name: str, default: str = ''):
+        return df[name].tolist() if name in df else [default] * len(df)
+
+    return [
+        Product(
+            name=name, price=float(price), description=description or None, category=category or None,
+            available=_flag(available), tags=tags or None, featured=_flag(featured)
+        )
+        for name, price, description, category, available, tags, featured in zip(
+            df['name'].tolist(), df['price'].tolist(), column('description'), column('category'),
+            column('available', 'true'), column('tags'), column('featured', 'false')
+        )
+    ]
+
+
+def import_seed_data(faq_path: Path = SEED_FAQS, menu_path: Path = SEED_MENU) -> Dict[str, int]:
+    """Copy the seed CSVs into the database, once per database
+
+    The database is the only source the index is built from, so seed rows need to
+    be there (with database ids as their keys) for edits to replace or remove them.
+    Rows whose question / product name the database already has are skipped, and a
+    setting records the import so seed rows deleted later are not brought back.
+    """
+    imported = {"faqs": 0, "menu": 0}
+    try:
+        with Session(engine) as session:
+            settings = SettingRepo(session)
+            if faq_path.exists() and not settings.get_value("knowledge.seed_faqs"):
+                known = {faq.question.strip().casefold() for faq in FAQRepo(session).get_all(active_only=False)}
+                faqs = [faq for faq in faqs_from_csv(faq_path.read_bytes()) if faq.question.strip().casefold() not in known]
+                imported["faqs"] = FAQRepo(session).create_many(faqs) if faqs else 0
+                settings.set("knowledge.seed_faqs", datetime.utcnow().isoformat(), category="knowledge")
+
+            if menu_path.exists() and not settings.get_value("knowledge.seed_menu"):
+                known = {product.name.strip().casefold() for product in ProductRepo(session).get_all(available_only=False)}
+                products = [product for product in products_from_csv(menu_path.read_bytes()) if product.name.strip().casefold() not in known]
+                imported["menu"] = ProductRepo(session).create_many(products) if products else 0
+                settings.set("knowledge.seed_menu", datetime.utcnow().isoformat(), category="knowledge")
+    except Exception as e:
+        logger.error(f"Error importing seed data into the database: {e}")
+
+    if imported["faqs"] or imported["menu"]:
+        logger.info(f"Imported {imported['faqs']} FAQs and {imported['menu']} products from the seed CSVs")
+    return imported
@@ -0,0 +1,295 @@
+import os
+import json
+import math
+import hashlib
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+import numpy as np
+import structlog
+
+from app.services.text_norm import normalize_text
+
+logger = structlog.get_logger()
+
+
+def tokenize(text: str) -> List[str]:
+    """Accent-folded word tokens, reusing those of an already normalized message"""
+    return list(normalize_text(text).tokens)
+
+
+def term_hash(term: str) -> int:
+    """64-bit key a term is stored under in the on-disk postings"""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class BM25Index:
+    """Inverted index with Okapi BM25 scoring, keyed by document id
+
+    On disk the index is a few flat arrays (see write()) that open() memory-maps, so
+    loading does not parse or hold every posting list. Documents added or removed
+    after opening live in an in-memory overlay until the index is written again.
+    """
+
+    TOKENIZER = "folded"  # saved with the index; one built with another tokenizer is rebuilt
+    META_FILE = "bm25.meta.json"
+    ARRAYS = ("terms", "term_starts", "doc_ids", "tfs", "docs", "lengths")  # saved as bm25.<name>.npy
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = self.TOKENIZER
+        # Base postings: term hashes (sorted), where each term's run starts in doc_ids/tfs,
+        # and the length of every base document (docs sorted)
+        self._terms = np.zeros(0, dtype='uint64')
+        self._term_starts = np.zeros(1, dtype='int64')
+        self._doc_ids = np.zeros(0, dtype='int64')
+        self._tfs = np.zeros(0, dtype='int32')
+        self._docs = np.zeros(0, dtype='int64')
+        self._lengths = np.zeros(0, dtype='int32')
+        # Overlay: documents indexed since, and base documents removed or replaced since
+        self._postings: Dict[str, Dict[int, int]] = {}  # term -> {doc id: term frequency}
+        self._overlay: Dict[int, Tuple[int, Counter]] = {}  # doc id -> (length, term counts)
+        self._deleted = set()
+        self._deleted_ids: Optional[np.ndarray] = None  # sorted copy of _deleted, built on demand
+        self._count = 0
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _base_row(self, doc_id: int) -> int:
+        """Row of doc_id in the base document table, or -1"""
+        pos = int(np.searchsorted(self._docs, doc_id))
+        if pos < len(self._docs) and self._docs[pos] == doc_id:
+            return pos
+        return -1
+
+    def add(self, doc_id: int, text: str):
+        """Index a document, replacing any previous version with the same id"""
+        self.remove(doc_id)
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        self._overlay[doc_id] = (len(tokens), counts)
+        self._count += 1
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: int):
+        """Drop a document if it is indexed"""
+        entry = self._overlay.pop(doc_id, None)
+        if entry is not None:
+            # Any base copy was already hidden when this one was added
+            length, counts = entry
+            for term in counts:
+                postings = self._postings[term]
+                del postings[doc_id]
+                if not postings:
+                    del self._postings[term]
+        else:
+            row = self._base_row(doc_id) if doc_id not in self._deleted else -1
+            if row < 0:
+                return
+            length = int(self._lengths[row])
+            self._deleted.add(doc_id)
+            self._deleted_ids = None
+        self._count -= 1
+        self.total_length -= length
+
+    def _base_postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Live (doc ids, term frequencies) of a term in the base postings"""
+        key = np.uint64(term_hash(term))
+        pos = int(np.searchsorted(self._terms, key))
+        if pos == len(self._terms) or self._terms[pos] != key:
+            return self._doc_ids[:0], self._tfs[:0]
+        start, end = int(self._term_starts[pos]), int(self._term_starts[pos + 1])
+        ids, tfs = self._doc_ids[start:end], self._tfs[start:end]
+        if self._deleted:
+            if self._deleted_ids is None:
+                self._deleted_ids = np.sort(np.fromiter(self._deleted, dtype='int64', count=len(self._deleted)))
+            live = ~np.isin(ids, self._deleted_ids, assume_unique=True)
+            ids, tfs = ids[live], tfs[live]
+        return ids, tfs
+
+    def search(self, query: str, top_k: int = 4, min_match: float = 0.0) -> List[Tuple[int, float]]:
+        """Return the top_k (doc id, score) pairs for a query
+
+        min_match drops documents matching less than that share of the query's terms,
+        each term weighted by its IDF, so a hit on "de" and "la" alone does not count
+        and a query word absent from the corpus counts as unmatched at full weight.
+        """
+        n = self._count
+        if not n:
+            return []
+
+        avg_length = self.total_length / n or 1.0
+        query_weight = 0.0
+        id_parts, score_parts, weight_parts = [], [], []
+        for term in set(tokenize(query)):
+            ids, tfs = self._base_postings(term)
+            lengths = self._lengths[np.searchsorted(self._docs, ids)]
+            extra = self._postings.get(term)
+            if extra:
+                ids = np.concatenate([ids, np.fromiter(extra.keys(), dtype='int64', count=len(extra))])
+                tfs = np.concatenate([tfs, np.fromiter(extra.values(), dtype='int32', count=len(extra))])
+                lengths = np.concatenate([lengths, [self._overlay[doc_id][0] for doc_id in extra]])
+            df = len(ids)
+            idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            query_weight += idf
+            if not df:
+                continue
+            tfs = tfs.astype('float64')
+            norm = self.k1 * (1.0 - self.b + self.b * lengths / avg_length)
+            id_parts.append(ids)
+            score_parts.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+            weight_parts.append(np.full(df, idf))
+
+        if not id_parts:
+            return []
+        ids, inverse = np.unique(np.concatenate(id_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        if min_match > 0:
+            matched = np.bincount(inverse, weights=np.concatenate(weight_parts)) / query_weight
+            keep = np.flatnonzero(matched >= min_match)
+            ids, scores = ids[keep], scores[keep]
+        if len(scores) > top_k:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def copy(self) -> "BM25Index":
+        """An independent index sharing the (read-only) base arrays"""
+        index = type(self).__new__(type(self))
+        index.__dict__.update(self.__dict__)
+        index._postings = {term: dict(postings) for term, postings in self._postings.items()}
+        index._overlay = dict(self._overlay)
+        index._deleted = set(self._deleted)
+        return index
+
+    def _merged_arrays(self) -> Dict[str, np.ndarray]:
+        """Base and overlay postings combined into the on-disk layout"""
+        hashes = np.repeat(np.asarray(self._terms), np.diff(self._term_starts))
+        ids, tfs = np.asarray(self._doc_ids), np.asarray(self._tfs)
+        docs, lengths = np.asarray(self._docs), np.asarray(self._lengths)
+        if self._deleted:
+            deleted = np.fromiter(self._deleted, dtype='int64', count=len(self._deleted))
+            live = ~np.isin(ids, deleted)
+            hashes, ids, tfs = hashes[live], ids[live], tfs[live]
+            live = ~np.isin(docs, deleted)
+            docs, lengths = docs[live], lengths[live]
+
+        extra_hashes, extra_ids, extra_tfs = array('Q'), array('q'), array('i')
+        for term, postings in self._postings.items():
+            key = term_hash(term)
+            for doc_id, tf in postings.items():
+                extra_hashes.append(key)
+                extra_ids.append(doc_id)
+                extra_tfs.append(tf)
+        extra_docs = np.fromiter(self._overlay.keys(), dtype='int64', count=len(self._overlay))
+        extra_lengths = np.fromiter((entry[0] for entry in self._overlay.values()), dtype='int32', count=len(self._overlay))
+
+        return self._compact(
+            np.concatenate([hashes, np.frombuffer(extra_hashes, dtype='uint64')]),
+            np.concatenate([ids, np.frombuffer(extra_ids, dtype='int64')]),
+            np.concatenate([tfs, np.frombuffer(extra_tfs, dtype='int32')]),
+            np.concatenate([docs, extra_docs]),
+            np.concatenate([lengths, extra_lengths])
+        )
+
+    @staticmethod
+    def _compact(hashes, ids, tfs, docs, lengths) -> Dict[str, np.ndarray]:
+        order = np.lexsort((ids, hashes))
+        hashes = hashes[order]
+        terms, starts = np.unique(hashes, return_index=True)
+        order_docs = np.argsort(docs, kind='stable')
+        return {
+            "terms": terms.astype('uint64'),
+            "term_starts": np.append(starts, len(hashes)).astype('int64'),
+            "doc_ids": ids[order].astype('int64'),
+            "tfs": tfs[order].astype('int32'),
+            "docs": docs[order_docs].astype('int64'),
+            "lengths": lengths[order_docs].astype('int32')
+        }
+
+    def _set_base(self, arrays: Dict[str, np.ndarray]):
+        self._terms = arrays["terms"]
+        self._term_starts = arrays["term_starts"]
+        self._doc_ids = arrays["doc_ids"]
+        self._tfs = arrays["tfs"]
+        self._docs = arrays["docs"]
+        self._lengths = arrays["lengths"]
+        self._count = len(self._docs)
+        self.total_length = int(np.sum(self._lengths, dtype='int64'))
+
+    @classmethod
+    def _array_file(cls, directory: Path, name: str) -> Path:
+        return directory / f"bm25.{name}.npy"
+
+    @classmethod
+    def exists(cls, directory: Path) -> bool:
+        return (directory / cls.META_FILE).exists()
+
+    def write(self, directory: Path):
+        """Write base and overlay to disk, replacing any previous index atomically per file"""
+        arrays = self._merged_arrays()
+        meta = {
+            "tokenizer": self.tokenizer,
+            "k1": self.k1,
+            "b": self.b,
+            "documents": len(arrays["docs"]),
+            "postings": len(arrays["doc_ids"])
+        }
+
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, values in arrays.items():
+            tmp = directory / f"tmp.bm25.{name}.npy"
+            np.save(tmp, values)
+            os.replace(tmp, self._array_file(directory, name))
+        # The metadata goes last and records the sizes open() checks the arrays against
+        tmp = directory / ("tmp." + self.META_FILE)
+        tmp.write_text(json.dumps(meta), encoding='utf-8')
+        os.replace(tmp, directory / self.META_FILE)
+
+    @classmethod
+    def open(cls, directory: Path) -> "BM25Index":
+        meta = json.loads((directory / cls.META_FILE).read_text(encoding='utf-8'))
+        index = cls(k1=meta.get("k1", 1.5), b=meta.get("b", 0.75))
+        index.tokenizer = meta.get("tokenizer", "lower")
+        arrays = {name: np.load(cls._array_file(directory, name), mmap_mode='r') for name in cls.ARRAYS}
+        if (len(arrays["docs"]) != meta["documents"] or len(arrays["doc_ids"]) != meta["postings"]
+                or len(arrays["term_starts"]) != len(arrays["terms"]) + 1):
+            raise ValueError(f"BM25 index files in {directory} do not match their metadata")
+        index._set_base(arrays)
+        return index
+
+    @classmethod
+    def build(cls, documents: Dict[int, Dict], **params) -> "BM25Index":
+        """Index documents straight into the compact layout"""
+        index = cls(**params)
+        hashes, ids, tfs = array('Q'), array('q'), array('i')
+        docs, lengths = array('q'), array('i')
+        keys: Dict[str, int] = {}
+        for doc_id, doc in documents.items():
+            tokens = tokenize(doc["text"])
+            for term, tf in Counter(tokens).items():
+                key = keys.get(term)
+                if key is None:
+                    key = keys[term] = term_hash(term)
+                hashes.append(key)
+                ids.append(doc_id)
+                tfs.append(tf)
+            docs.append(doc_id)
+            lengths.append(len(tokens))
+
+        index._set_base(cls._compact(
+            np.frombuffer(hashes, dtype='uint64'),
+            np.frombuffer(ids, dtype='int64'),
+            np.frombuffer(tfs, dtype='int32'),
+            np.frombuffer(docs, dtype='int64'),
+            np.frombuffer(lengths, dtype='int32')
+        ))
+        return index
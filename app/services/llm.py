@@ -5,6 +5,8 @@ from openai import OpenAI
 import google.generativeai as genai
 
 from app.settings import settings, config
+from app.services.rag import rag_service
+from app.services.answer_cache import SemanticAnswerCache
 
 logger = structlog.get_logger()
 
@@ -31,6 +33,16 @@ class LLMService:
         
         if settings.gemini_api_key:
             genai.configure(api_key=settings.gemini_api_key)
+        
+        # Replies reused for paraphrases of a question that retrieved the same context
+        self.answer_cache = None
+        cache_config = config.get("ai", {}).get("answer_cache", {})
+        if cache_config.get("enabled", True):
+            self.answer_cache = SemanticAnswerCache(
+                threshold=cache_config.get("threshold", 0.92),
+                max_size=cache_config.get("max_size", 1000),
+                ttl_seconds=cache_config.get("ttl_seconds", 3600)
+            )
     
     async def generate_response(
         self, 
@@ -44,7 +56,7 @@ class LLMService:
             return self._generate_template_response(user_message, context_docs, intent)
         
         elif self.ai_mode == "api_llm":
-            return await self._generate_api_response(user_message, context_docs, intent)
+            return await self._cached_api_response(user_message, context_docs, intent)
         
         elif self.ai_mode == "local_llm":
             return await self._generate_ollama_response(user_message, context_docs, intent)
@@ -87,6 +99,30 @@ class LLMService:
             "confidence": best_doc.get("score", 0.0)
         }
     
+    async def _cached_api_response(
+        self,
+        user_message: str,
+        context_docs: List[Dict[str, Any]],
+        intent: str
+    ) -> Dict[str, Any]:
+        """API LLM response, served from the semantic answer cache when a paraphrase was answered before"""
+        # The RAG search for this message already embedded it; no second encode
+        embedding = rag_service.cached_query_embedding(user_message) if self.answer_cache else None
+        if embedding is None:
+            return await self._generate_api_response(user_message, context_docs, intent)
+        
+        context = tuple(doc.get("id") for doc in (context_docs or [])[:3])  # the docs the prompt uses
+        version = rag_service.index_version
+        cached = self.answer_cache.get(embedding, context, version)
+        if cached is not None:
+            return {**cached, "cached": True}
+        
+        response = await self._generate_api_response(user_message, context_docs, intent)
+        # Template fallbacks are not worth caching, nor replies built on a knowledge base that just changed
+        if response.get("source") == "api_llm" and rag_service.index_version == version:
+            self.answer_cache.put(embedding, context, response, version)
+        return response
+    
     async def _generate_api_response(
         self, 
         user_message: str, 
@@ -1,11 +1,22 @@
 import re
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Dict, List, Optional, Any, NamedTuple, Tuple
 import structlog
 from app.settings import config
+from app.services.product_matcher import product_matcher
+from app.services.intent_classifier import CentroidIntentClassifier
+from app.services.rag import rag_service
+from app.services.text_norm import normalize_text, strip_accents
 
 logger = structlog.get_logger()
 
 
+class RuleMatch(NamedTuple):
+    """Result of matching a message against the intent rules"""
+    intent: Optional[str]  # first intent, in rule order, with any pattern matched
+    matches: int  # number of that intent's patterns that matched
+
+
 class NLUService:
     def __init__(self):
         self.intent_rules = {
@@ -42,17 +53,64 @@ class NLUService:
                 r"\b(nos vemos|hasta pronto)\b"
             ]
         }
+        self._compile_rules()
+        # The responder calls detect_intent then get_confidence_score on the same message;
+        # the last scan is kept (one tuple, swapped atomically) so the second call reuses it
+        self._last_match: Tuple[str, RuleMatch] = ("", RuleMatch(None, 0))
+        
+        classifier_config = config.get("nlu", {}).get("classifier", {})
+        self.classifier = None
+        if classifier_config.get("enabled", False):
+            self.classifier = CentroidIntentClassifier(
+                classifier_config.get("examples", {}),
+                min_score=classifier_config.get("min_score", 0.55),
+                margin=classifier_config.get("margin", 0.0)
+            )
+        self._fit_lock = threading.Lock()
+    
+    def _compile_rules(self):
+        """Precompile every rule pattern, accent-folded like the messages it is matched against"""
+        self._compiled: Dict[str, List[re.Pattern]] = {
+            intent: [re.compile(strip_accents(pattern), re.IGNORECASE) for pattern in patterns]
+            for intent, patterns in self.intent_rules.items()
+        }
+    
+    @staticmethod
+    def _count_matches(patterns: List[re.Pattern], folded: str) -> int:
+        return sum(1 for pattern in patterns if pattern.search(folded))
+    
+    def match_rules(self, text: str) -> RuleMatch:
+        """The first intent, in rule order, with a matching pattern, and how many of its patterns match
+        
+        Intents after the winner are never scanned.
+        """
+        folded = normalize_text(text).folded
+        last_text, last_match = self._last_match
+        if last_text == folded:
+            return last_match
+        
+        result = RuleMatch(None, 0)
+        for intent, patterns in self._compiled.items():
+            count = self._count_matches(patterns, folded)
+            if count:
+                result = RuleMatch(intent, count)
+                break
+        self._last_match = (folded, result)
+        return result
     
     def detect_intent(self, text: str, rag_results: Optional[List[Dict]] = None) -> str:
         """Detect intent using rules and RAG context"""
-        text_lower = text.lower()
-        
         # Check rule-based intents
-        for intent, patterns in self.intent_rules.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    logger.debug(f"Detected intent '{intent}' via rule: {pattern}")
-                    return intent
+        rules = self.match_rules(text)
+        if rules.intent:
+            logger.debug(f"Detected intent '{rules.intent}' via rules")
+            return rules.intent
+        
+        # Nearest intent centroid to the query embedding RAG search already computed
+        classified = self.classify_embedding(text)
+        if classified:
+            logger.debug(f"Detected intent '{classified[0]}' via embedding classifier ({classified[1]:.3f})")
+            return classified[0]
         
         # Check RAG results for additional context
         if rag_results:
@@ -65,10 +123,36 @@ class NLUService:
         # Default intent
         return "unknown"
     
+    def fit_classifier(self) -> bool:
+        """Embed the classifier's examples once; blocking, so call it off the event loop"""
+        if self.classifier is None:
+            return False
+        with self._fit_lock:
+            if self.classifier.dim is not None:
+                return True
+            try:
+                self.classifier.fit(rag_service.encode)
+            except Exception as e:
+                logger.warning(f"Intent classifier not fitted, rules and RAG sources only: {e}")
+                return False
+        return self.classifier.dim is not None
+    
+    def classify_embedding(self, text: str) -> Optional[Tuple[str, float]]:
+        """Classify text by its cached query embedding; never encodes anything itself
+        
+        Returns None until fit_classifier has run, or when the embedding size doesn't match.
+        """
+        if self.classifier is None:
+            return None
+        embedding = rag_service.cached_query_embedding(text)
+        if embedding is None:
+            return None
+        return self.classifier.classify(embedding)
+    
     def extract_entities(self, text: str, intent: str) -> Dict[str, Any]:
         """Extract entities based on intent"""
         entities = {}
-        text_lower = text.lower()
+        text_lower = normalize_text(text).folded
         
         if intent == "order":
             # Extract quantities
@@ -91,22 +175,15 @@ class NLUService:
         return entities
     
     def _extract_product_mentions(self, text: str) -> List[str]:
-        """Extract potential product mentions from text"""
-        # This is a simple implementation
-        # In production, you'd want to match against actual product names
-        common_products = [
-            "pizza", "hamburguesa", "taco", "burrito", "quesadilla",
-            "café", "refresco", "agua", "jugo", "cerveza",
-            "ensalada", "sopa", "postre", "helado"
-        ]
-        
+        """Names of catalog products mentioned in text, by product name, category or tag"""
         mentioned = []
-        text_lower = text.lower()
-        
-        for product in common_products:
-            if product in text_lower:
-                mentioned.append(product)
-        
+        for mention in product_matcher.find(text):
+            for product_id in mention.product_ids if mention.kind == "name" else ():
+                name = product_matcher.product_name(product_id)
+                if name and name not in mentioned:
+                    mentioned.append(name)
+            if mention.kind == "tag" and mention.term not in mentioned:
+                mentioned.append(mention.term)
         return mentioned
     
     def get_confidence_score(self, text: str, intent: str) -> float:
@@ -114,17 +191,17 @@ class NLUService:
         if intent == "unknown":
             return 0.1
         
-        text_lower = text.lower()
-        pattern_matches = 0
-        total_patterns = 0
+        total_patterns = len(self.intent_rules.get(intent, []))
+        rules = self.match_rules(text)
+        if rules.intent == intent:
+            pattern_matches = rules.matches
+        else:
+            pattern_matches = self._count_matches(self._compiled.get(intent, []), normalize_text(text).folded)
         
-        if intent in self.intent_rules:
-            patterns = self.intent_rules[intent]
-            total_patterns = len(patterns)
-            
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    pattern_matches += 1
+        if pattern_matches == 0:
+            classified = self.classify_embedding(text)
+            if classified and classified[0] == intent:
+                return classified[1]
         
         if total_patterns == 0:
             return 0.5
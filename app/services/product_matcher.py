@@ -0,0 +1,247 @@
+import threading
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from sqlmodel import Session
+import structlog
+
+from app.deps import engine
+from app.db import events
+from app.db.models import Product
+from app.db.repo import ProductRepo
+from app.services.text_norm import fold_text, normalize_text
+
+logger = structlog.get_logger()
+
+
+def product_terms(product: Product) -> Dict[str, str]:
+    """Folded terms a product is recognized by: its name ("name"), category and tags ("tag")"""
+    terms: Dict[str, str] = {}
+    for tag in [product.category or ""] + (product.tags or "").split(","):
+        tag = fold_text(tag)
+        if tag:
+            terms[tag] = "tag"
+    name = fold_text(product.name or "")
+    if name:
+        terms[name] = "name"
+    return terms
+
+
+class ProductMention(NamedTuple):
+    term: str  # folded catalog term as it occurs in the message
+    kind: str  # name|tag
+    product_ids: Tuple[int, ...]
+    start: int
+    end: int
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher over a trie with failure links
+
+    Terms can be added and removed one at a time; only the failure links are
+    recomputed (lazily, on the next search) and dead trie branches are dropped
+    once removed terms outnumber live ones.
+    """
+
+    def __init__(self, terms: Iterable[str] = ()):
+        self._reset()
+        for term in terms:
+            self.add(term)
+
+    def _reset(self):
+        self._children: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[Optional[str]] = [None]
+        self._outputs: List[Tuple[str, ...]] = [()]
+        self._terms = set()
+        self._removed = 0
+        self._stale = False
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._terms
+
+    def add(self, term: str):
+        if not term or term in self._terms:
+            return
+        node = 0
+        for char in term:
+            child = self._children[node].get(char)
+            if child is None:
+                child = len(self._children)
+                self._children[node][char] = child
+                self._children.append({})
+                self._fail.append(0)
+                self._terminal.append(None)
+                self._outputs.append(())
+            node = child
+        self._terminal[node] = term
+        self._terms.add(term)
+        self._stale = True
+
+    def remove(self, term: str):
+        if term not in self._terms:
+            return
+        node = 0
+        for char in term:
+            node = self._children[node][char]
+        self._terminal[node] = None
+        self._terms.discard(term)
+        self._removed += 1
+        if self._removed > max(64, len(self._terms)):
+            terms = list(self._terms)
+            self._reset()
+            for live in terms:
+                self.add(live)
+        self._stale = True
+
+    def _link(self):
+        """Breadth-first pass setting failure links and each node's full output list"""
+        queue = deque()
+        for child in self._children[0].values():
+            self._fail[child] = 0
+            self._outputs[child] = (self._terminal[child],) if self._terminal[child] else ()
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for char, child in self._children[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._children[fail]:
+                    fail = self._fail[fail]
+                fail = self._children[fail].get(char, 0)
+                self._fail[child] = fail
+                own = (self._terminal[child],) if self._terminal[child] else ()
+                self._outputs[child] = own + self._outputs[fail]
+                queue.append(child)
+        self._stale = False
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, term) for every occurrence, overlapping ones included"""
+        if self._stale:
+            self._link()
+        children, fail, outputs = self._children, self._fail, self._outputs
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in children[node]:
+                node = fail[node]
+            node = children[node].get(char, 0)
+            for term in outputs[node]:
+                yield i + 1 - len(term), i + 1, term
+
+
+class ProductCatalogMatcher:
+    """Finds catalog products mentioned in a message in one pass over its text
+
+    Built from the available products' names, categories and tags on first use.
+    Product change events are queued and applied before the next lookup, editing
+    only the terms of the products that changed.
+    """
+
+    def __init__(self):
+        self._automaton = AhoCorasick()
+        self._owners: Dict[str, Dict[int, str]] = {}  # term -> {product id: kind}
+        self._products: Dict[int, Tuple[str, Dict[str, str]]] = {}  # id -> (name, terms)
+        self._pending: Dict[int, bool] = {}  # product id -> deleted
+        self._loaded = False
+        self._lock = threading.RLock()
+        events.subscribe(self.notify)
+
+    def notify(self, change: events.KnowledgeChange):
+        if change.entity != "product" or change.entity_id is None:
+            return
+        with self._lock:
+            if self._loaded:
+                self._pending[change.entity_id] = change.deleted
+
+    def load(self, products: Iterable[Product]):
+        """Replace the catalog with the given products"""
+        with self._lock:
+            self._automaton = AhoCorasick()
+            self._owners, self._products = {}, {}
+            for product in products:
+                self._set_product(product)
+            self._pending.clear()
+            self._loaded = True
+        logger.info(f"Product matcher loaded {len(self._products)} products, {len(self._automaton)} terms")
+
+    def _ensure_current(self):
+        if not self._loaded:
+            try:
+                with Session(engine) as session:
+                    self.load(ProductRepo(session).get_all())
+            except Exception as e:
+                logger.error(f"Error loading products for mention matching: {e}")
+                self._loaded = True
+            return
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            with Session(engine) as session:
+                for product_id, deleted in pending.items():
+                    product = None if deleted else session.get(Product, product_id)
+                    if product is not None and product.available:
+                        self._set_product(product)
+                    else:
+                        self._remove_product(product_id)
+        except Exception as e:
+            logger.error(f"Error applying product changes to the mention matcher: {e}")
+            for product_id, deleted in pending.items():
+                self._pending.setdefault(product_id, deleted)
+
+    def _set_product(self, product: Product):
+        self._remove_product(product.id)
+        terms = product_terms(product)
+        self._products[product.id] = (product.name, terms)
+        for term, kind in terms.items():
+            self._owners.setdefault(term, {})[product.id] = kind
+            self._automaton.add(term)
+
+    def _remove_product(self, product_id: int):
+        entry = self._products.pop(product_id, None)
+        if entry is None:
+            return
+        for term in entry[1]:
+            owners = self._owners.get(term)
+            if owners is None:
+                continue
+            owners.pop(product_id, None)
+            if not owners:
+                del self._owners[term]
+                self._automaton.remove(term)
+
+    def find(self, text: str) -> List[ProductMention]:
+        """Whole-word catalog terms in text, leftmost-longest and non-overlapping"""
+        folded = normalize_text(text).folded
+        with self._lock:
+            self._ensure_current()
+            candidates = [
+                (start, end, term) for start, end, term in self._automaton.finditer(folded)
+                if (start == 0 or not folded[start - 1].isalnum())
+                and (end == len(folded) or not folded[end].isalnum())
+            ]
+            candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+
+            mentions, covered = [], 0
+            for start, end, term in candidates:
+                if start < covered:
+                    continue
+                owners = self._owners[term]
+                # A term that is some product's name counts as a name mention
+                kind = "name" if "name" in owners.values() else "tag"
+                ids = tuple(pid for pid, owner_kind in owners.items() if owner_kind == kind)
+                mentions.append(ProductMention(term, kind, ids, start, end))
+                covered = end
+            return mentions
+
+    def product_name(self, product_id: int) -> Optional[str]:
+        entry = self._products.get(product_id)
+        return entry[0] if entry else None
+
+    def stats(self):
+        return {"products": len(self._products), "terms": len(self._automaton), "pending": len(self._pending)}
+
+
+# Global product matcher instance
+product_matcher = ProductCatalogMatcher()
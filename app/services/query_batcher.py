@@ -0,0 +1,75 @@
+import asyncio
+from typing import Any, Callable, List, Mapping, Optional, Tuple
+from concurrent.futures import Executor
+import structlog
+
+logger = structlog.get_logger()
+
+# (query, top_k, min_score)
+SearchRequest = Tuple[str, int, float]
+
+
+class QueryBatcher:
+    """Collect search requests arriving within a short window and run them as one batch"""
+
+    def __init__(
+        self,
+        search_batch: Callable[[List[SearchRequest]], List[List[Mapping[str, Any]]]],
+        executor: Executor,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0
+    ):
+        self.search_batch = search_batch
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[SearchRequest, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()  # Keep running batches referenced until they finish
+
+    async def submit(self, query: str, top_k: int, min_score: float) -> List[Mapping[str, Any]]:
+        """Queue one search and wait for the batch that carries it"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # First use, or a new event loop (e.g. after a reload): start clean
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        future = loop.create_future()
+        self._pending.append(((query, top_k, min_score), future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[SearchRequest, asyncio.Future]]):
+        requests = [request for request, _ in batch]
+        try:
+            results = await self._loop.run_in_executor(self.executor, self.search_batch, requests)
+        except Exception as e:
+            logger.error(f"Error running search batch: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -1,307 +1,1063 @@
 import os
 import json
+import time
+import asyncio
+import hashlib
+import heapq
+import threading
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from sqlmodel import Session
 import structlog
-import PyPDF2
 from io import BytesIO
 
 from app.settings import config
+from app.services.embedding_cache import EmbeddingCache
+from app.services.query_batcher import QueryBatcher, SearchRequest
+from app.services.lru_cache import LRUCache
+from app.services.index_jobs import RebuildJob
+from app.services import vector_index
+from app.services.lexical import BM25Index
+from app.services.docstore import DocStore
+from app.services import ingest
+from app.services import knowledge_seed
+from app.services.chunker import chunk_stream
+from app.services.search_hit import SearchHit
+from app.services.text_norm import normalize_text
+from app.services.embedding_backend import load_embedding_model, embedding_variant
+from app.db.repo import FAQRepo, ProductRepo
+from app.deps import engine
 
 logger = structlog.get_logger()
 
 
+def document_id(key: str) -> int:
+    """Map a stable document key (e.g. "faq:12") to a positive int64 FAISS id"""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") & 0x7FFFFFFFFFFFFFFF
+
+
+def faq_key(faq_id: Any = None, question: str = "") -> str:
+    """Stable key for an FAQ, by primary key when known, else by question text"""
+    if faq_id is not None and pd.notna(faq_id):
+        return f"faq:{int(faq_id)}"
+    return f"faq:q:{hashlib.sha1(str(question).strip().lower().encode('utf-8')).hexdigest()[:16]}"
+
+
+def product_key(product_id: Any = None, name: str = "") -> str:
+    """Stable key for a menu product, by primary key when known, else by name"""
+    if product_id is not None and pd.notna(product_id):
+        return f"menu:{int(product_id)}"
+    return f"menu:n:{hashlib.sha1(str(name).strip().lower().encode('utf-8')).hexdigest()[:16]}"
+
+
+def doc_chunk_key(file_name: str, chunk_id: int) -> str:
+    """Stable key for one chunk of an uploaded document"""
+    return f"doc:{file_name}#{chunk_id}"
+
+
+def faq_document(faq) -> Dict[str, Any]:
+    """Index document for an FAQ row"""
+    return {
+        "key": faq_key(faq.id, faq.question),
+        "text": f"Q: {faq.question}\nA: {faq.answer}",
+        "source": "faq",
+        "metadata": {
+            "question": faq.question,
+            "answer": faq.answer,
+            "tags": faq.tags or ''
+        }
+    }
+
+
+def product_document(product) -> Dict[str, Any]:
+    """Index document for a Product row"""
+    text = f"Producto: {product.name}\nPrecio: ${product.price}"
+    if product.description:
+        text += f"\nDescripción: {product.description}"
+    if product.category:
+        text += f"\nCategoría: {product.category}"
+    return {
+        "key": product_key(product.id, product.name),
+        "text": text,
+        "source": "menu",
+        "metadata": {
+            "name": product.name,
+            "price": product.price,
+            "description": product.description or '',
+            "category": product.category or '',
+            "product_id": product.id
+        }
+    }
+
+
+class IndexSnapshot:
+    """A FAISS index, the documents its ids point to and their BM25 index, published together"""
+    
+    def __init__(
+        self,
+        index=None,
+        documents: Optional[Dict[int, Dict[str, Any]]] = None,
+        lexical: Optional[BM25Index] = None,
+        exact: Optional[vector_index.ExactVectorStore] = None
+    ):
+        self.index = index
+        self.exact = exact  # Full-precision vectors when the index is quantized
+        self.documents = documents if documents is not None else {}  # FAISS id -> document
+        self.lexical = lexical if lexical is not None else BM25Index.build(self.documents)
+
+
 class RAGService:
     def __init__(self):
         self.model = None  # Lazy load to avoid import issues on startup
-        self.index = None
-        self.documents = []
+        self.model_name = 'all-MiniLM-L6-v2'
+        self._current = IndexSnapshot()
+        self._loaded = False
+        self._loading = False
         self.index_path = Path("faiss_index")
-        self.documents_path = self.index_path / "documents.json"
+        self.documents_path = self.index_path / "documents.json"  # Legacy format, migrated on load
         self.index_file = self.index_path / "index.faiss"
+        self.legacy_lexical_path = self.index_path / "bm25.json"  # JSON postings, converted on load
+        self.embedding_config = config.get("retrieval", {}).get("embedding", {})
+        self.embedding_cache = EmbeddingCache(
+            self.index_path / "embedding_cache", embedding_variant(self.model_name, self.embedding_config)
+        )
+        self.index_config = config.get("retrieval", {}).get("index", {})
+        self.retrieval_mode = config.get("retrieval", {}).get("mode", "dense")  # dense | hybrid
+        self.hybrid_config = config.get("retrieval", {}).get("hybrid", {})
         
-        # Create index directory if it doesn't exist
-        self.index_path.mkdir(exist_ok=True)
+        # Guards index mutation against concurrent searches
+        self._lock = threading.RLock()
+        # Serializes the (slow) model load without holding _lock, so keyword search and edits go on
+        self._model_lock = threading.Lock()
+        # Serializes writes of the index files; taken before _lock, never while holding it.
+        # Edits are written shortly after they happen, from a copy, so searches never wait on disk
+        self._persist_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+        self.save_delay = config.get("retrieval", {}).get("save_delay_ms", 2000) / 1000.0
+        # Bounded pool that runs encode + FAISS search off the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.get("retrieval", {}).get("search_workers", 2),
+            thread_name_prefix="rag-search"
+        )
+        # Repeated short queries skip the encoder and, until the index changes, the search
+        cache_config = config.get("retrieval", {}).get("cache", {})
+        self._query_embeddings = LRUCache(cache_config.get("query_embeddings", 2048))
+        self._search_results = LRUCache(cache_config.get("results", 1024))
+        self.index_version = 0
         
-        # Load existing index if available
-        self.load_index()
+        # Background rebuilds; upserts/removals made during one are replayed before the swap
+        self.jobs: Dict[str, RebuildJob] = {}
+        self._current_job: Optional[RebuildJob] = None
+        self._rebuild_log: Optional[List[tuple]] = None
+        
+        # Coalesces concurrent queries into one encode + one FAISS search
+        batching = config.get("retrieval", {}).get("batching", {})
+        self._batcher = None
+        if batching.get("enabled", True):
+            self._batcher = QueryBatcher(
+                self.search_batch,
+                self._executor,
+                max_batch_size=batching.get("max_batch_size", 16),
+                max_wait_ms=batching.get("max_wait_ms", 5)
+            )
+        
+        # Disk and model loading is deferred to warmup() (or the first use), keeping import fast
+        self._ready = threading.Event()
+        self.warmup_error: Optional[str] = None
+        self.warmup_seconds: Optional[float] = None
+    
+    @property
+    def _snapshot(self) -> IndexSnapshot:
+        if not self._loaded:
+            self.ensure_loaded()
+        return self._current
+    
+    @property
+    def ready(self) -> bool:
+        """True once warmup has loaded the index and model and run an encode"""
+        return self._ready.is_set()
+    
+    def ensure_loaded(self):
+        """Load the index from disk on first use"""
+        with self._lock:
+            if self._loaded or self._loading:
+                return
+            self._loading = True
+            try:
+                # Create index directory if it doesn't exist
+                self.index_path.mkdir(exist_ok=True)
+                
+                # Load existing index if available
+                self.load_index()
+                self._loaded = True
+            finally:
+                self._loading = False
+    
+    def warmup(self) -> Dict[str, Any]:
+        """Load the index and model and run one encode, then mark the service ready"""
+        start = time.perf_counter()
+        try:
+            self.ensure_loaded()
+            if self._init_model():
+                self._encode(["warmup"])
+            else:
+                self.warmup_error = "Embedding model unavailable, serving keyword search only"
+        except Exception as e:
+            logger.error(f"Error warming up RAG service: {e}")
+            self.warmup_error = str(e)
+        self.warmup_seconds = round(time.perf_counter() - start, 3)
+        self._ready.set()
+        logger.info(f"RAG service ready in {self.warmup_seconds}s")
+        return {"ready": True, "seconds": self.warmup_seconds, "error": self.warmup_error}
+    
+    @property
+    def index(self):
+        return self._snapshot.index
+    
+    @property
+    def documents(self) -> Dict[int, Dict[str, Any]]:
+        return self._snapshot.documents
+    
+    def _publish(self, snapshot: IndexSnapshot):
+        """Swap in a new index and document set as a single reference assignment"""
+        with self._lock:
+            self._current = snapshot
+            self._loaded = True
+            self._index_changed()
     
     def _init_model(self):
         """Lazy initialization of the sentence transformer model"""
         if self.model is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            with self._model_lock:
+                if self.model is not None:
+                    return True
+                try:
+                    model = load_embedding_model(self.model_name, self.embedding_config)
+                except ImportError as e:
+                    logger.error(f"Failed to import sentence-transformers: {e}")
+                    logger.warning("RAG functionality will be limited")
+                    return False
+                with self._lock:
+                    self.model = model
                 logger.info("Sentence transformer model loaded")
-            except ImportError as e:
-                logger.error(f"Failed to import sentence-transformers: {e}")
-                logger.warning("RAG functionality will be limited")
-                return False
         return True
     
     def load_index(self):
-        """Load existing FAISS index and documents"""
+        """Load existing FAISS index, documents and BM25 index"""
         try:
-            if self.index_file.exists() and self.documents_path.exists():
+            legacy = False
+            if DocStore.exists(self.index_path):
+                documents = DocStore.open(self.index_path)
+            elif self.documents_path.exists():
+                with open(self.documents_path, 'r', encoding='utf-8') as f:
+                    documents = json.load(f)
+                legacy = True
+            else:
+                logger.info("No existing index found, will create new one")
+                return
+            
+            index = None
+            if self.index_file.exists():
                 try:
                     import faiss
-                    self.index = faiss.read_index(str(self.index_file))
-                    with open(self.documents_path, 'r', encoding='utf-8') as f:
-                        self.documents = json.load(f)
-                    logger.info(f"Loaded index with {len(self.documents)} documents")
+                    index = faiss.read_index(str(self.index_file))
+                    if legacy and documents and "id" not in documents[0]:
+                        index, documents = self._migrate_positional_index(index, documents)
+                    vector_index.configure_search(index, self.index_config)
                 except ImportError:
-                    logger.warning("FAISS not available, RAG search disabled")
-            else:
-                logger.info("No existing index found, will create new one")
+                    logger.warning("FAISS not available, using keyword search only")
+                except RuntimeError as e:
+                    # A damaged vector index should not take the documents down with it
+                    logger.error(f"Error reading FAISS index, using keyword search until it is rebuilt: {e}")
+                    self.warmup_error = f"FAISS index could not be loaded: {e}"
+                    index = None
+            
+            if legacy:
+                for doc in documents:
+                    if "id" not in doc:
+                        self._assign_key(doc)
+                documents = {doc["id"]: doc for doc in documents}
+            
+            lexical = None
+            if BM25Index.exists(self.index_path):
+                try:
+                    lexical = BM25Index.open(self.index_path)
+                    if lexical.tokenizer != BM25Index.TOKENIZER:
+                        logger.info("BM25 index was built with another tokenizer, rebuilding it from the documents")
+                        lexical = None
+                except (OSError, ValueError) as e:
+                    logger.warning(f"BM25 index is unreadable, rebuilding it from the documents: {e}")
+            if lexical is None:
+                # One-time cost: every document is decoded to index it
+                logger.warning(f"Building the BM25 index from {len(documents)} documents")
+                lexical = BM25Index.build(documents)
+                lexical.write(self.index_path)
+                lexical = BM25Index.open(self.index_path)
+                if self.legacy_lexical_path.exists():
+                    self.legacy_lexical_path.unlink()
+            
+            exact = None
+            if vector_index.storage_type(self.index_config) != "float32" and vector_index.ExactVectorStore.exists(self.index_path):
+                exact = vector_index.ExactVectorStore.open(self.index_path)
+            
+            snapshot = IndexSnapshot(index, documents, lexical, exact)
+            if legacy and index is not None:
+                # Move documents.json into the memory-mapped document store
+                self._write_index_files(snapshot)
+                self._reopen_index_files(snapshot)
+                self.documents_path.unlink()
+            
+            self._publish(snapshot)
+            logger.info(f"Loaded index with {len(self.documents)} documents")
         except Exception as e:
-            logger.error(f"Error loading index: {e}")
-            self.index = None
-            self.documents = []
+            # Serve (and report) an empty index rather than fail startup; a rebuild replaces it
+            logger.error(f"Error loading index, serving an empty one until it is rebuilt: {e}")
+            self.warmup_error = f"Index could not be loaded: {e}"
+            self._publish(IndexSnapshot())
+    
+    def _migrate_positional_index(self, index, documents: List[Dict[str, Any]]):
+        """Convert an index saved before documents had stable ids into an ID-mapped one"""
+        logger.info("Migrating positional index to ID-mapped index")
+        vectors = index.reconstruct_n(0, index.ntotal)
+        for doc in documents:
+            self._assign_key(doc)
+        
+        migrated = vector_index.empty_index(vectors.shape[1])
+        migrated.add_with_ids(vectors, np.array([doc["id"] for doc in documents], dtype='int64'))
+        return migrated, documents
     
     def save_index(self):
-        """Save FAISS index and documents to disk"""
+        """Save FAISS index, documents and BM25 index to disk, without blocking searches"""
         try:
-            if self.index is not None:
-                import faiss
-                faiss.write_index(self.index, str(self.index_file))
-                with open(self.documents_path, 'w', encoding='utf-8') as f:
-                    json.dump(self.documents, f, ensure_ascii=False, indent=2)
-                logger.info(f"Saved index with {len(self.documents)} documents")
+            with self._persist_lock:
+                # Copy under the lock (in memory only), write the copy without it
+                with self._lock:
+                    # This save covers any pending one; edits from here on schedule another
+                    timer, self._save_timer = self._save_timer, None
+                    if timer is not None and timer is not threading.current_thread():
+                        timer.cancel()
+                    snapshot = self._snapshot
+                    if snapshot.index is None:
+                        return
+                    if snapshot.index.ntotal < len(snapshot.documents):
+                        # Never persist vectors for only part of the documents
+                        logger.warning(
+                            f"Not saving an index with {snapshot.index.ntotal} vectors for {len(snapshot.documents)} documents"
+                        )
+                        return
+                    index_version = self.index_version
+                    copy = IndexSnapshot(
+                        self._serialize(snapshot.index),
+                        snapshot.documents.copy(),
+                        snapshot.lexical.copy(),
+                        snapshot.exact.copy() if snapshot.exact is not None else None
+                    )
+                self._write_index_files(copy)
+                
+                # Unless edited meanwhile, serve from the files just written, emptying the overlays
+                with self._lock:
+                    if self._current is snapshot and self.index_version == index_version:
+                        self._reopen_index_files(snapshot)
+            logger.info(f"Saved index with {len(copy.documents)} documents")
         except Exception as e:
             logger.error(f"Error saving index: {e}")
+        self.embedding_cache.save()
     
-    def chunk_text(self, text: str, chunk_size: int = 300, overlap: int = 50) -> List[str]:
-        """Split text into overlapping chunks"""
-        words = text.split()
-        chunks = []
-        
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = ' '.join(words[i:i + chunk_size])
-            if chunk.strip():
-                chunks.append(chunk.strip())
-        
-        return chunks
+    def _schedule_save(self):
+        """Save the index in the background shortly, coalescing a burst of edits into one write"""
+        with self._lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.save_index)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+    
+    def flush(self):
+        """Write edits still waiting for a background save, e.g. on shutdown"""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+            self.save_index()
+    
+    @staticmethod
+    def _serialize(index) -> np.ndarray:
+        import faiss
+        return faiss.serialize_index(index)
+    
+    def _write_index_files(self, snapshot: IndexSnapshot):
+        """Write a snapshot nothing else is mutating to the index directory, file by file atomically"""
+        index = snapshot.index if isinstance(snapshot.index, np.ndarray) else self._serialize(snapshot.index)
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        tmp_index = self.index_path / ("tmp." + self.index_file.name)
+        index.tofile(str(tmp_index))
+        os.replace(tmp_index, self.index_file)
+        documents = snapshot.documents
+        DocStore.write(self.index_path, documents.encoded_items() if isinstance(documents, DocStore) else documents.items())
+        snapshot.lexical.write(self.index_path)
+        if snapshot.exact is not None:
+            snapshot.exact.write(self.index_path)
+    
+    def _reopen_index_files(self, snapshot: IndexSnapshot):
+        """Serve documents, postings and exact vectors from the memory-mapped files just written"""
+        snapshot.documents = DocStore.open(self.index_path)
+        snapshot.lexical = BM25Index.open(self.index_path)
+        if snapshot.exact is not None:
+            snapshot.exact = vector_index.ExactVectorStore.open(self.index_path)
+    
+    def _index_changed(self):
+        """Invalidate cached search results after the index or documents change"""
+        self.index_version += 1
+        self._search_results.clear()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the query caches, for monitoring; never loads the index"""
+        snapshot = self._current
+        return {
+            "ready": self.ready,
+            "loaded": self._loaded,
+            "index_version": self.index_version,
+            "index_type": vector_index.index_kind(snapshot.index) if snapshot.index is not None else None,
+            "documents": len(snapshot.documents),
+            "stale_vectors": self._stale_vectors(snapshot) if snapshot.index is not None else 0,
+            "query_embeddings": self._query_embeddings.stats(),
+            "results": self._search_results.stats()
+        }
+    
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        return normalize_text(query).casefolded
+    
+    def cached_query_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Embedding of a recently searched query, if still cached; never runs the encoder"""
+        return self._query_embeddings.peek(self._normalize_query(query))
+    
+    def _assign_key(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Ensure a document carries its stable key and FAISS id"""
+        if "key" not in doc:
+            meta = doc.get("metadata", {})
+            if doc.get("source") == "faq":
+                doc["key"] = faq_key(meta.get("faq_id"), meta.get("question", ""))
+            elif doc.get("source") == "menu":
+                doc["key"] = product_key(meta.get("product_id"), meta.get("name", ""))
+            else:
+                doc["key"] = doc_chunk_key(meta.get("file_name", ""), meta.get("chunk_id", 0))
+        doc["id"] = document_id(doc["key"])
+        return doc
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts with the embedding model, loading it first if needed"""
+        if not self._init_model():
+            raise RuntimeError("Embedding model unavailable")
+        return self._encode(texts)
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into L2-normalized float32 embeddings"""
+        import faiss
+        embeddings = self.model.encode(texts, convert_to_tensor=False)
+        embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+        faiss.normalize_L2(embeddings)
+        return embeddings
+    
+    def chunking_config(self) -> Dict[str, Any]:
+        """Chunking settings, picklable so ingestion workers can rebuild the same chunker"""
+        retrieval_config = config.get("retrieval", {})
+        chunking = dict(retrieval_config.get("chunking", {}))
+        chunking.setdefault("chunk_size", retrieval_config.get("chunk_size", 300))
+        chunking.setdefault("model_name", self.model_name)
+        return chunking
+    
+    def chunk_text(self, text: str) -> List[str]:
+        """Split text into chunks that fit the embedding model"""
+        return list(chunk_stream([text], self.chunking_config()))
     
     def load_faqs_from_csv(self, csv_path: str) -> List[Dict[str, Any]]:
         """Load FAQs from CSV file"""
-        documents = []
+        return list(self.iter_faqs_from_csv(csv_path))
+    
+    def iter_faqs_from_csv(self, csv_path: str):
+        """Yield FAQ documents, reading the CSV in chunks and building each chunk column-wise"""
         try:
-            df = pd.read_csv(csv_path)
-            for _, row in df.iterrows():
-                documents.append({
-                    "text": f"Q: {row['question']}\nA: {row['answer']}",
-                    "source": "faq",
-                    "metadata": {
-                        "question": row['question'],
-                        "answer": row['answer'],
-                        "tags": row.get('tags', '')
+            for df in pd.read_csv(csv_path, chunksize=self._csv_chunk_rows()):
+                questions = df['question']
+                answers = df['answer']
+                texts = "Q: " + questions.astype(str) + "\nA: " + answers.astype(str)
+                ids = df['id'].tolist() if 'id' in df else [None] * len(df)
+                tags = df['tags'].tolist() if 'tags' in df else [''] * len(df)
+                
+                for faq_id, question, answer, tag, text in zip(
+                    ids, questions.tolist(), answers.tolist(), tags, texts.tolist()
+                ):
+                    yield {
+                        "key": faq_key(faq_id, question),
+                        "text": text,
+                        "source": "faq",
+                        "metadata": {
+                            "question": question,
+                            "answer": answer,
+                            "tags": tag
+                        }
                     }
-                })
         except Exception as e:
             logger.error(f"Error loading FAQs from {csv_path}: {e}")
-        
-        return documents
     
     def load_menu_from_csv(self, csv_path: str) -> List[Dict[str, Any]]:
         """Load menu items from CSV file"""
-        documents = []
+        return list(self.iter_menu_from_csv(csv_path))
+    
+    def iter_menu_from_csv(self, csv_path: str):
+        """Yield documents for available menu items, reading the CSV in chunks"""
         try:
-            df = pd.read_csv(csv_path)
-            for _, row in df.iterrows():
-                if row.get('available', True):
-                    text = f"Producto: {row['name']}\nPrecio: ${row['price']}"
-                    if pd.notna(row.get('description')):
-                        text += f"\nDescripción: {row['description']}"
-                    if pd.notna(row.get('category')):
-                        text += f"\nCategoría: {row['category']}"
-                    
-                    documents.append({
+            for df in pd.read_csv(csv_path, chunksize=self._csv_chunk_rows()):
+                if 'available' in df:
+                    df = df[df['available'].astype(bool)]
+                if df.empty:
+                    continue
+                
+                names = df['name']
+                texts = "Producto: " + names.astype(str) + "\nPrecio: $" + df['price'].astype(str)
+                for column, label in (('description', 'Descripción'), ('category', 'Categoría')):
+                    if column in df:
+                        values = df[column]
+                        texts = texts + ("\n" + label + ": " + values.astype(str)).where(values.notna(), "")
+                
+                count = len(df)
+                ids = df['id'].tolist() if 'id' in df else [None] * count
+                descriptions = df['description'].tolist() if 'description' in df else [''] * count
+                categories = df['category'].tolist() if 'category' in df else [''] * count
+                
+                for product_id, name, price, description, category, text in zip(
+                    ids, names.tolist(), df['price'].tolist(), descriptions, categories, texts.tolist()
+                ):
+                    yield {
+                        "key": product_key(product_id, name),
                         "text": text,
                         "source": "menu",
                         "metadata": {
-                            "name": row['name'],
-                            "price": row['price'],
-                            "description": row.get('description', ''),
-                            "category": row.get('category', ''),
-                            "product_id": row.get('id', None)
+                            "name": name,
+                            "price": price,
+                            "description": description,
+                            "category": category,
+                            "product_id": product_id
                         }
-                    })
+                    }
         except Exception as e:
             logger.error(f"Error loading menu from {csv_path}: {e}")
-        
-        return documents
     
-    def load_document_from_file(self, file_path: str) -> List[Dict[str, Any]]:
-        """Load and chunk document from file"""
-        documents = []
-        path = Path(file_path)
-        
+    def load_faqs_from_db(self) -> List[Dict[str, Any]]:
+        """Load active FAQs from the database"""
         try:
-            if path.suffix.lower() == '.pdf':
-                text = self._extract_pdf_text(file_path)
-            elif path.suffix.lower() in ['.txt', '.md']:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-            else:
-                logger.warning(f"Unsupported file type: {path.suffix}")
-                return documents
-            
-            chunks = self.chunk_text(text, config.get("retrieval", {}).get("chunk_size", 300))
-            
-            for i, chunk in enumerate(chunks):
-                documents.append({
-                    "text": chunk,
-                    "source": "document",
-                    "metadata": {
-                        "file_name": path.name,
-                        "file_path": str(path),
-                        "chunk_id": i,
-                        "total_chunks": len(chunks)
-                    }
-                })
-        
+            return self._faqs_from_db()
         except Exception as e:
-            logger.error(f"Error loading document from {file_path}: {e}")
-        
-        return documents
+            logger.error(f"Error loading FAQs from database: {e}")
+            return []
     
-    def _extract_pdf_text(self, pdf_path: str) -> str:
-        """Extract text from PDF file"""
-        text = ""
+    def load_menu_from_db(self) -> List[Dict[str, Any]]:
+        """Load available products from the database"""
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+            return self._menu_from_db()
         except Exception as e:
-            logger.error(f"Error extracting PDF text: {e}")
-        return text
+            logger.error(f"Error loading menu from database: {e}")
+            return []
+    
+    @staticmethod
+    def _faqs_from_db() -> List[Dict[str, Any]]:
+        with Session(engine) as session:
+            return [faq_document(faq) for faq in FAQRepo(session).get_all()]
+    
+    @staticmethod
+    def _menu_from_db() -> List[Dict[str, Any]]:
+        with Session(engine) as session:
+            return [product_document(product) for product in ProductRepo(session).get_all()]
     
-    def rebuild_index(self) -> Dict[str, int]:
+    @staticmethod
+    def _csv_chunk_rows() -> int:
+        return config.get("retrieval", {}).get("csv_chunk_rows", 50000)
+    
+    def load_document_from_file(self, file_path: str) -> List[Dict[str, Any]]:
+        """Load and chunk document from file"""
+        chunks = ingest.file_chunks(file_path, self.chunking_config())
+        return self._chunk_documents(file_path, chunks)
+    
+    def _chunk_documents(self, file_path: str, chunks: List[str]) -> List[Dict[str, Any]]:
+        path = Path(file_path)
+        return [
+            {
+                "key": doc_chunk_key(path.name, i),
+                "text": chunk,
+                "source": "document",
+                "metadata": {
+                    "file_name": path.name,
+                    "file_path": str(path),
+                    "chunk_id": i,
+                    "total_chunks": len(chunks)
+                }
+            }
+            for i, chunk in enumerate(chunks)
+        ]
+    
+    def _iter_source_documents(self, stats: Dict[str, int]):
+        """Yield FAQ, menu and document-chunk documents as each source is loaded"""
+        # FAQs and menu come from the database only (the seed CSVs are imported into it once),
+        # so every document is keyed by its row id and sync edits replace it. The CSVs stand
+        # in only when the database cannot be read at all
+        knowledge_seed.import_seed_data()
+        sources = (
+            ("faqs", self._faqs_from_db, self.iter_faqs_from_csv, Path("data/faqs.csv")),
+            ("menu", self._menu_from_db, self.iter_menu_from_csv, Path("data/menu.csv"))
+        )
+        for name, from_db, from_csv, csv_path in sources:
+            try:
+                docs = from_db()
+            except Exception as e:
+                logger.error(f"Error loading {name} from database, indexing {csv_path} instead: {e}")
+                docs = from_csv(str(csv_path)) if csv_path.exists() else []
+            for doc in docs:
+                stats[name] += 1
+                yield doc
+        
+        # Load Documents, parsed in parallel and streamed in as each file finishes
+        docs_dir = Path("data/docs")
+        if docs_dir.exists():
+            paths = [str(file_path) for file_path in sorted(docs_dir.glob("*")) if file_path.is_file()]
+            for file_path, chunks in ingest.iter_file_chunks(
+                paths, self.chunking_config(), workers=ingest.ingest_workers(config.get("retrieval", {}))
+            ):
+                stats["docs"] += len(chunks)
+                yield from self._chunk_documents(file_path, chunks)
+    
+    def rebuild_index(self, job: Optional[RebuildJob] = None) -> Dict[str, int]:
         """Rebuild the entire FAISS index from data sources"""
         logger.info("Starting index rebuild")
+        job = job or RebuildJob()
         
         # Initialize model if needed
         if not self._init_model():
             return {"error": "Failed to initialize AI model", "faqs": 0, "menu": 0, "docs": 0}
         
-        all_documents = []
         stats = {"faqs": 0, "menu": 0, "docs": 0}
         
-        # Load FAQs
-        faq_path = Path("data/faqs.csv")
-        if faq_path.exists():
-            faq_docs = self.load_faqs_from_csv(str(faq_path))
-            all_documents.extend(faq_docs)
-            stats["faqs"] = len(faq_docs)
-        
-        # Load Menu
-        menu_path = Path("data/menu.csv")
-        if menu_path.exists():
-            menu_docs = self.load_menu_from_csv(str(menu_path))
-            all_documents.extend(menu_docs)
-            stats["menu"] = len(menu_docs)
-        
-        # Load Documents
-        docs_dir = Path("data/docs")
-        if docs_dir.exists():
-            for file_path in docs_dir.glob("*"):
-                if file_path.is_file():
-                    doc_docs = self.load_document_from_file(str(file_path))
-                    all_documents.extend(doc_docs)
-                    stats["docs"] += len(doc_docs)
-        
-        if not all_documents:
-            logger.warning("No documents found to index")
-            return stats
-        
         try:
             import faiss
             
-            # Generate embeddings
-            texts = [doc["text"] for doc in all_documents]
-            embeddings = self.model.encode(texts, convert_to_tensor=False, show_progress_bar=True)
+            # Stream documents into fixed-size embedding batches while later sources are
+            # still being parsed, reusing cached vectors for unchanged chunks
+            batch_size = config.get("retrieval", {}).get("embed_batch_size", 256)
+            documents = {}
+            id_batches, batches = [], []
+            pending = []
+            job.update(stage="embedding")
+            for doc in self._iter_source_documents(stats):
+                self._assign_key(doc)
+                documents[doc["id"]] = doc
+                pending.append(doc)
+                job.update(documents_loaded=job.documents_loaded + 1, chunks_total=job.chunks_total + 1)
+                if len(pending) >= batch_size:
+                    self._embed_pending(pending, id_batches, batches, job)
+            self._embed_pending(pending, id_batches, batches, job)
             
-            # Create FAISS index
-            dimension = embeddings.shape[1]
-            self.index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
+            if not documents:
+                logger.warning("No documents found to index")
+                return stats
             
-            # Normalize embeddings for cosine similarity
-            faiss.normalize_L2(embeddings)
-            self.index.add(embeddings.astype('float32'))
+            # A repeated key keeps the last occurrence
+            ids = np.concatenate(id_batches)
+            embeddings = np.vstack(batches)
+            if len(documents) < len(ids):
+                _, last = np.unique(ids[::-1], return_index=True)
+                keep = np.sort(len(ids) - 1 - last)
+                ids, embeddings = ids[keep], embeddings[keep]
             
-            # Store documents
-            self.documents = all_documents
+            # Create FAISS index, exact or approximate depending on corpus size and config
+            job.update(stage="indexing")
+            index = vector_index.build_index(embeddings, ids, self.index_config)
+            exact = None
+            if vector_index.storage_type(self.index_config) != "float32":
+                exact = vector_index.ExactVectorStore.from_arrays(ids, embeddings)
+            snapshot = IndexSnapshot(index, documents, exact=exact)
             
-            # Save to disk
-            self.save_index()
+            # Save the new index while only this thread can see it, then swap it in,
+            # replaying edits made while it was being built
+            job.update(stage="swapping")
+            with self._persist_lock:
+                self._write_index_files(snapshot)
+                self._reopen_index_files(snapshot)
+                with self._lock:
+                    for operation, payload in self._rebuild_log or []:
+                        if operation == "upsert":
+                            self._apply_upsert(snapshot, *payload)
+                        else:
+                            self._apply_remove(snapshot, payload)
+                    self._publish(snapshot)
+                    # Every document has its vector again
+                    self.warmup_error = None
+                    if self._rebuild_log:
+                        self._schedule_save()
             
-            logger.info(f"Index rebuilt with {len(all_documents)} documents")
+            # Drop cached vectors of chunks that no longer exist
+            self.embedding_cache.save(
+                keep=[self.embedding_cache.content_hash(doc["text"]) for doc in snapshot.documents.values()]
+            )
+            
+            logger.info(f"Index rebuilt with {len(snapshot.documents)} documents")
             return stats
         
         except ImportError:
             logger.error("FAISS not available for indexing")
             return {"error": "FAISS not available", "faqs": 0, "menu": 0, "docs": 0}
     
-    def search(self, query: str, top_k: int = 4, min_score: float = 0.5) -> List[Dict[str, Any]]:
+    def _embed_pending(self, pending: List[Dict[str, Any]], id_batches: List[np.ndarray], batches: List[np.ndarray], job: RebuildJob):
+        if not pending:
+            return
+        id_batches.append(np.fromiter((doc["id"] for doc in pending), dtype='int64', count=len(pending)))
+        batches.append(self.embedding_cache.encode([doc["text"] for doc in pending], self._encode))
+        job.update(chunks_embedded=job.chunks_embedded + len(pending))
+        pending.clear()
+    
+    def start_rebuild(self) -> RebuildJob:
+        """Start a rebuild on a background thread, or return the one already running"""
+        with self._lock:
+            if self._current_job is not None and self._current_job.active:
+                return self._current_job
+            
+            job = RebuildJob()
+            self.jobs[job.job_id] = job
+            # Keep only the most recent jobs around for status queries
+            for old_id in list(self.jobs)[:-10]:
+                del self.jobs[old_id]
+            self._current_job = job
+            self._rebuild_log = []
+        
+        threading.Thread(target=self._run_rebuild, args=(job,), name=f"rag-rebuild-{job.job_id}", daemon=True).start()
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[RebuildJob]:
+        return self.jobs.get(job_id)
+    
+    def _run_rebuild(self, job: RebuildJob):
+        job.start()
+        try:
+            job.finish(self.rebuild_index(job))
+        except Exception as e:
+            logger.error(f"Error rebuilding index in job {job.job_id}: {e}")
+            job.fail(str(e))
+        finally:
+            with self._lock:
+                self._rebuild_log = None
+    
+    @staticmethod
+    def _vectors_missing(snapshot: IndexSnapshot) -> bool:
+        """Documents are indexed but there is no vector index for them, e.g. index.faiss was unreadable"""
+        return snapshot.index is None and len(snapshot.documents) > 0
+    
+    def _apply_upsert(self, snapshot: IndexSnapshot, batch: Dict[int, Dict[str, Any]], ids: np.ndarray, embeddings: np.ndarray) -> bool:
+        """Apply an upsert; False when only the documents and BM25 could be updated"""
+        if self._vectors_missing(snapshot):
+            # An index of just this batch would hide every other document from dense search
+            snapshot.documents.update(batch)
+            for doc_id, doc in batch.items():
+                snapshot.lexical.add(doc_id, doc["text"])
+            return False
+        if snapshot.index is None:
+            snapshot.index = vector_index.empty_index(embeddings.shape[1])
+        else:
+            vector_index.remove_ids(snapshot.index, ids)
+        snapshot.index.add_with_ids(embeddings, ids)
+        if snapshot.exact is not None:
+            snapshot.exact.update(ids, embeddings)
+        snapshot.documents.update(batch)
+        for doc_id, doc in batch.items():
+            snapshot.lexical.add(doc_id, doc["text"])
+        return True
+    
+    def _apply_remove(self, snapshot: IndexSnapshot, ids: List[int]):
+        if snapshot.index is not None:
+            vector_index.remove_ids(snapshot.index, np.array(ids, dtype='int64'))
+        if snapshot.exact is not None:
+            snapshot.exact.remove(ids)
+        for doc_id in ids:
+            doc = snapshot.documents.pop(doc_id, None)
+            if doc is not None:
+                snapshot.lexical.remove(doc_id)
+    
+    def upsert_documents(self, documents: List[Dict[str, Any]]) -> int:
+        """Add or replace documents by key, embedding only the given documents"""
+        if not documents:
+            return 0
+        
+        if not self._init_model():
+            raise RuntimeError("Failed to initialize AI model")
+        
+        batch = {}
+        for doc in documents:
+            self._assign_key(doc)
+            batch[doc["id"]] = doc
+        
+        ids = np.fromiter(batch.keys(), dtype='int64', count=len(batch))
+        embeddings = self.embedding_cache.encode([doc["text"] for doc in batch.values()], self._encode)
+        
+        with self._lock:
+            snapshot = self._snapshot
+            vectors_applied = self._apply_upsert(snapshot, batch, ids, embeddings)
+            self._index_changed()
+            if self._rebuild_log is not None:
+                self._rebuild_log.append(("upsert", (dict(batch), ids, embeddings)))
+            
+            if vectors_applied:
+                self._schedule_save()
+            else:
+                self._rebuild_missing_vectors(snapshot)
+        logger.info(f"Upserted {len(batch)} documents")
+        return len(batch)
+    
+    def remove_documents(self, keys: List[str]) -> int:
+        """Remove documents from the index by key"""
+        with self._lock:
+            ids = [document_id(key) for key in keys]
+            if self._rebuild_log is not None:
+                self._rebuild_log.append(("remove", ids))
+            
+            snapshot = self._snapshot
+            ids = [doc_id for doc_id in ids if doc_id in snapshot.documents]
+            if not ids:
+                return 0
+            
+            # Without a vector index the documents and BM25 still serve the keyword fallback
+            self._apply_remove(snapshot, ids)
+            self._index_changed()
+            
+            if self._vectors_missing(snapshot):
+                self._rebuild_missing_vectors(snapshot)
+            else:
+                self._schedule_save()
+        logger.info(f"Removed {len(ids)} documents")
+        return len(ids)
+    
+    def _rebuild_missing_vectors(self, snapshot: IndexSnapshot):
+        """Rebuild the vector index the documents lack; nothing is saved until it exists"""
+        logger.warning(f"No vector index for {len(snapshot.documents)} documents, rebuilding it")
+        self.start_rebuild()
+    
+    def upsert_file(self, file_path: str) -> int:
+        """Re-index a single document file, dropping chunks it no longer produces"""
+        documents = self.load_document_from_file(file_path)
+        self.remove_file(file_path, keep=[doc["key"] for doc in documents])
+        return self.upsert_documents(documents)
+    
+    def remove_file(self, file_path: str, keep: Optional[List[str]] = None) -> int:
+        """Remove every indexed chunk of a document file"""
+        prefix = f"doc:{Path(file_path).name}#"
+        keep = set(keep or [])
+        keys = [
+            doc["key"] for doc in list(self.documents.values())
+            if doc["key"].startswith(prefix) and doc["key"] not in keep
+        ]
+        return self.remove_documents(keys)
+    
+    def search(self, query: str, top_k: int = 4, min_score: float = 0.5) -> List[SearchHit]:
         """Search for relevant documents"""
-        if self.index is None or not self.documents:
+        if self._use_hybrid(self._snapshot):
+            candidates = max(top_k, self.hybrid_config.get("candidates", 20))
+            dense = self.search_batch([(query, candidates, min_score)])[0]
+            lexical = self._simple_text_search(query, candidates, self._lexical_min_match())
+            return self._fuse(dense, lexical, top_k)
+        
+        return self.search_batch([(query, top_k, min_score)])[0]
+    
+    def search_batch(self, requests: List[SearchRequest]) -> List[List[SearchHit]]:
+        """Search several (query, top_k, min_score) requests with one encode and one FAISS search"""
+        snapshot = self._snapshot
+        if snapshot.index is None or not snapshot.documents:
             logger.warning("No index available for search")
             # Fallback to simple text search
-            return self._simple_text_search(query, top_k)
+            return [self._simple_text_search(query, top_k) for query, top_k, _ in requests]
         
         try:
             import faiss
             
+            # Serve repeated requests from the results cache
+            batch_results: List[Optional[List[SearchHit]]] = []
+            result_keys = []
+            for query, top_k, min_score in requests:
+                key = (self._normalize_query(query), top_k, min_score)
+                result_keys.append(key)
+                cached = self._search_results.get(key)
+                if cached is not None:
+                    # Keep the embedding as fresh as its results: the answer cache and the
+                    # intent classifier read it back through cached_query_embedding()
+                    self._query_embeddings.touch(key[0])
+                batch_results.append(list(cached) if cached is not None else None)
+            
+            pending = [i for i, results in enumerate(batch_results) if results is None]
+            if not pending:
+                return batch_results
+            
             # Initialize model if needed
             if not self._init_model():
-                return self._simple_text_search(query, top_k)
+                return [self._simple_text_search(query, top_k) for query, top_k, _ in requests]
             
-            # Generate query embedding
-            query_embedding = self.model.encode([query], convert_to_tensor=False)
-            faiss.normalize_L2(query_embedding)
+            # Generate embeddings for queries not seen recently as a single batch
+            embeddings = {}
+            to_encode = []
+            for i in pending:
+                normalized = result_keys[i][0]
+                vector = self._query_embeddings.get(normalized)
+                if vector is not None:
+                    embeddings[normalized] = vector
+                elif normalized not in to_encode:
+                    to_encode.append(normalized)
+            if to_encode:
+                for normalized, vector in zip(to_encode, self._encode(to_encode)):
+                    self._query_embeddings.put(normalized, vector)
+                    embeddings[normalized] = vector
             
-            # Search
-            scores, indices = self.index.search(query_embedding.astype('float32'), top_k)
+            query_embeddings = np.vstack([embeddings[result_keys[i][0]] for i in pending])
+            max_k = max(requests[i][1] for i in pending)
             
-            results = []
-            for score, idx in zip(scores[0], indices[0]):
-                if idx >= 0 and score >= min_score:
-                    doc = self.documents[idx].copy()
-                    doc["score"] = float(score)
-                    results.append(doc)
+            # Search; the index may be mutated by an upsert from another thread
+            with self._lock:
+                snapshot = self._snapshot
+                index_version = self.index_version
+                
+                # A quantized index only shortlists candidates; scores come from exact vectors.
+                # HNSW cannot delete, so an updated document also keeps its old vector under the
+                # same id: while there are such stale vectors, candidates are re-scored against
+                # each id's current vector so the old text no longer matches
+                stale = self._stale_vectors(snapshot) if snapshot.exact is None else 0
+                rerank = snapshot.exact is not None or stale > 0
+                rerank_factor = self.index_config.get("rerank_factor", 4) if rerank else 1
+                scores, ids = snapshot.index.search(query_embeddings, max_k * rerank_factor)
+                if snapshot.exact is not None:
+                    scores, ids = self._rerank(snapshot.exact.get, query_embeddings, ids)
+                elif stale > 0:
+                    scores, ids = self._rerank(partial(self._current_vector, snapshot), query_embeddings, ids)
+                
+                for i, row_scores, row_ids in zip(pending, scores, ids):
+                    _, top_k, min_score = requests[i]
+                    results = []
+                    seen = set()  # HNSW keeps replaced vectors, so an id can repeat
+                    for score, doc_id in zip(row_scores, row_ids):
+                        if len(results) == top_k or score < min_score:
+                            break
+                        if doc_id >= 0 and doc_id in snapshot.documents and doc_id not in seen:
+                            seen.add(doc_id)
+                            results.append(SearchHit(snapshot.documents[doc_id], score))
+                    batch_results[i] = results
             
-            return results
+            # Skip caching if the index changed while we were searching
+            if index_version == self.index_version:
+                for i in pending:
+                    self._search_results.put(result_keys[i], tuple(batch_results[i]))
+            
+            return batch_results
         
         except Exception as e:
             logger.error(f"Error during search: {e}")
-            return self._simple_text_search(query, top_k)
+            return [self._simple_text_search(query, top_k) for query, top_k, _ in requests]
+    
+    @staticmethod
+    def _stale_vectors(snapshot: IndexSnapshot) -> int:
+        """Vectors left behind by updates or removals the index could not delete"""
+        return max(0, snapshot.index.ntotal - len(snapshot.documents))
+    
+    @staticmethod
+    def _current_vector(snapshot: IndexSnapshot, doc_id: int) -> Optional[np.ndarray]:
+        # IndexIDMap2 maps an id to the vector added last under it
+        if doc_id not in snapshot.documents:
+            return None
+        return snapshot.index.reconstruct(int(doc_id))
     
-    def _simple_text_search(self, query: str, top_k: int = 4) -> List[Dict[str, Any]]:
-        """Fallback simple text search when FAISS is not available"""
-        query_lower = query.lower()
-        results = []
+    def _rerank(self, vector_of: Callable[[int], Optional[np.ndarray]], queries: np.ndarray, candidate_ids: np.ndarray):
+        """Re-score index candidates against each id's current full-precision vector, best first"""
+        scores = np.full(candidate_ids.shape, -np.inf, dtype='float32')
+        for row, (query, row_ids) in enumerate(zip(queries, candidate_ids)):
+            for col, doc_id in enumerate(row_ids):
+                vector = vector_of(doc_id) if doc_id >= 0 else None
+                if vector is not None:
+                    scores[row, col] = float(np.dot(vector, query))
         
-        for doc in self.documents:
-            text_lower = doc["text"].lower()
-            score = 0.0
-            
-            # Simple keyword matching
-            query_words = query_lower.split()
-            for word in query_words:
-                if word in text_lower:
-                    score += 1.0 / len(query_words)
-            
-            if score > 0:
-                doc_copy = doc.copy()
-                doc_copy["score"] = score
-                results.append(doc_copy)
+        order = np.argsort(-scores, axis=1, kind='stable')
+        ids = np.take_along_axis(candidate_ids, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        ids[scores == -np.inf] = -1
+        return scores, ids
+    
+    async def asearch(self, query: str, top_k: int = 4, min_score: float = 0.5) -> List[SearchHit]:
+        """Search without blocking the event loop, batching with concurrent requests when enabled"""
+        loop = asyncio.get_running_loop()
+        if not self._loaded:
+            # The first search loads the index from disk; do that, and the whole search, off the loop
+            return await loop.run_in_executor(self._executor, partial(self.search, query, top_k, min_score))
+        if not self._use_hybrid(self._current):
+            return await self._dense_asearch(query, top_k, min_score)
+        
+        # Hybrid: the lexical leg runs alongside the dense one and is dropped if over budget
+        candidates = max(top_k, self.hybrid_config.get("candidates", 20))
+        budget = self.hybrid_config.get("lexical_budget_ms", 30) / 1000.0
+        started = time.perf_counter()
+        
+        lexical_future = loop.run_in_executor(
+            self._executor, self._simple_text_search, query, candidates, self._lexical_min_match()
+        )
+        dense = await self._dense_asearch(query, candidates, min_score)
+        try:
+            remaining = budget - (time.perf_counter() - started)
+            lexical = await asyncio.wait_for(lexical_future, timeout=max(remaining, 0))
+        except asyncio.TimeoutError:
+            logger.warning("Lexical search exceeded its latency budget, using dense results only")
+            lexical = []
         
-        # Sort by score and return top_k
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:top_k]
+        return self._fuse(dense, lexical, top_k)
+    
+    async def _dense_asearch(self, query: str, top_k: int, min_score: float) -> List[SearchHit]:
+        if self._batcher is not None:
+            return await self._batcher.submit(query, top_k, min_score)
+        
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            self._executor, partial(self.search_batch, [(query, top_k, min_score)])
+        )
+        return results[0]
+    
+    def _lexical_min_match(self) -> float:
+        # Dense hits must clear min_score; lexical ones must match enough of the query
+        return self.hybrid_config.get("lexical_min_match", 0.5)
+    
+    def _use_hybrid(self, snapshot: IndexSnapshot) -> bool:
+        # Without a dense index the "dense" leg is already the lexical fallback
+        return self.retrieval_mode == "hybrid" and snapshot.index is not None
+    
+    def _fuse(self, dense: List[SearchHit], lexical: List[SearchHit], top_k: int) -> List[SearchHit]:
+        """Reciprocal rank fusion of dense and lexical rankings"""
+        rrf_k = self.hybrid_config.get("rrf_k", 60)
+        weights = {
+            "dense_score": self.hybrid_config.get("dense_weight", 1.0),
+            "lexical_score": self.hybrid_config.get("lexical_weight", 1.0)
+        }
+        # Scale fused scores into (0, 1]: a document ranked first by both legs scores 1.0
+        best = sum(weights.values()) / (rrf_k + 1)
+        
+        fused: Dict[int, list] = {}  # id -> [score, document, leg scores]
+        for field, hits in (("dense_score", dense), ("lexical_score", lexical)):
+            for rank, hit in enumerate(hits, start=1):
+                entry = fused.setdefault(hit.id, [0.0, hit.doc, {}])
+                entry[0] += weights[field] / (rrf_k + rank) / best
+                entry[2][field] = hit.score
+        
+        top = heapq.nlargest(top_k, fused.values(), key=lambda entry: entry[0])
+        return [SearchHit(doc, score, legs) for score, doc, legs in top]
+    
+    def _simple_text_search(self, query: str, top_k: int = 4, min_match: float = 0.0) -> List[SearchHit]:
+        """Keyword search over the BM25 index, used when FAISS or the model is not available"""
+        with self._lock:
+            snapshot = self._snapshot
+            hits = snapshot.lexical.search(query, top_k, min_match)
+            
+            return [SearchHit(snapshot.documents[doc_id], score) for doc_id, score in hits]
 
 
 # Global RAG service instance
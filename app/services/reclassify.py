@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import hashlib
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import update
+from sqlmodel import Session, select
+import structlog
+
+from app.settings import config
+from app.deps import engine
+from app.db.models import Message
+from app.services.ingest import process_pool
+
+logger = structlog.get_logger()
+
+CHECKPOINT_PATH = "data/reclassify_checkpoint.json"
+CHECKPOINT_INTERVAL = 2.0  # seconds; re-classifying a chunk after a crash is harmless
+SEARCH_BATCH = 256  # well inside the query embedding cache, so the classifier still finds them
+
+
+def rules_fingerprint() -> str:
+    """Hash of everything that decides an intent; a checkpoint only resumes under the same one"""
+    from app.services.nlu import nlu_service
+    settings = {
+        "rules": nlu_service.intent_rules,
+        "nlu": config.get("nlu", {}),
+        "retrieval": {key: config.get("retrieval", {}).get(key) for key in ("top_k", "min_score")}
+    }
+    return hashlib.sha1(json.dumps(settings, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def classify_texts(texts: List[str], rules_only: bool = False) -> List[str]:
+    """Intents for a batch of messages, the way the chat path would detect them now
+
+    Regex rules settle most messages in one compiled scan each. The rest are
+    searched in batches, which encodes them together and leaves their embeddings
+    cached for the intent classifier and the RAG-source fallback.
+    """
+    from app.services.nlu import nlu_service
+    from app.services.rag import rag_service
+
+    intents = [nlu_service.match_rules(text).intent for text in texts]
+    unmatched = [i for i, intent in enumerate(intents) if intent is None]
+    if unmatched and not rules_only:
+        nlu_service.fit_classifier()
+        retrieval = config.get("retrieval", {})
+        top_k = retrieval.get("top_k", 4)
+        min_score = retrieval.get("min_score", 0.5)
+        for start in range(0, len(unmatched), SEARCH_BATCH):
+            batch = unmatched[start:start + SEARCH_BATCH]
+            results = rag_service.search_batch([(texts[i], top_k, min_score) for i in batch])
+            for i, rag_results in zip(batch, results):
+                intents[i] = nlu_service.detect_intent(texts[i], rag_results)
+    return [intent or "unknown" for intent in intents]
+
+
+def _classify_chunk(rows: List[Tuple[int, str]], rules_only: bool) -> List[Tuple[int, str]]:
+    intents = classify_texts([text for _, text in rows], rules_only)
+    return [(message_id, intent) for (message_id, _), intent in zip(rows, intents)]
+
+
+def iter_message_chunks(after_id: int = 0, chunk_size: int = 1000) -> Iterator[List[Tuple[int, str, str]]]:
+    """Yield (id, text, intent) rows of classified user messages, keyset-paginated by id"""
+    last_id = after_id
+    while True:
+        with Session(engine) as session:
+            statement = (
+                select(Message.id, Message.text, Message.intent)
+                .where(Message.id > last_id, Message.is_from_user == True, Message.intent != None)
+                .order_by(Message.id)
+                .limit(chunk_size)
+            )
+            rows = session.exec(statement).all()
+        if not rows:
+            return
+        yield [tuple(row) for row in rows]
+        last_id = rows[-1][0]
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def reclassify_messages(
+    chunk_size: int = 5000,
+    workers: Optional[int] = None,
+    rules_only: bool = False,
+    dry_run: bool = False,
+    resume: bool = True,
+    checkpoint_path: str = CHECKPOINT_PATH
+) -> Dict[str, Any]:
+    """Re-detect the intent of every stored user message and write back the ones that changed
+
+    Chunks are read by id while earlier ones are classified in worker processes
+    and written back in id order, one bulk UPDATE per chunk; every few seconds the
+    checkpoint records the last id written, so an interrupted run picks up there.
+    """
+    fingerprint = rules_fingerprint()
+    checkpoint = load_checkpoint(checkpoint_path) if resume else {}
+    if checkpoint.get("fingerprint") != fingerprint or checkpoint.get("completed"):
+        checkpoint = {}
+    last_id = checkpoint.get("last_id", 0)
+    stats = {
+        "processed": checkpoint.get("processed", 0),
+        "changed": checkpoint.get("changed", 0),
+        "transitions": checkpoint.get("transitions", {})
+    }
+    if last_id:
+        logger.info(f"Resuming reclassification after message {last_id} ({stats['processed']} already processed)")
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    run_processed = 0
+    saved_at = start
+
+    def write(rows: List[Tuple[int, str, str]], intents: List[Tuple[int, str]]):
+        nonlocal last_id, run_processed, saved_at
+        old = {message_id: intent for message_id, _, intent in rows}
+        changes = [{"id": message_id, "intent": intent} for message_id, intent in intents if old[message_id] != intent]
+        if changes and not dry_run:
+            with Session(engine) as session:
+                session.execute(update(Message), changes)
+                session.commit()
+        for change in changes:
+            transition = f"{old[change['id']]}->{change['intent']}"
+            stats["transitions"][transition] = stats["transitions"].get(transition, 0) + 1
+
+        last_id = rows[-1][0]
+        run_processed += len(rows)
+        stats["processed"] += len(rows)
+        stats["changed"] += len(changes)
+        now = time.perf_counter()
+        if not dry_run and now - saved_at >= CHECKPOINT_INTERVAL:
+            save_checkpoint(checkpoint_path, dict(stats, fingerprint=fingerprint, last_id=last_id, completed=False))
+            saved_at = now
+        elapsed = now - start
+        logger.info(
+            f"Reclassified {stats['processed']} messages through id {last_id}, {stats['changed']} changed "
+            f"({run_processed / elapsed:.0f} msgs/s)"
+        )
+
+    chunks = iter_message_chunks(last_id, chunk_size)
+    if workers <= 1:
+        for rows in chunks:
+            write(rows, _classify_chunk([(message_id, text) for message_id, text, _ in rows], rules_only))
+    else:
+        with process_pool(workers) as pool:
+            in_flight = deque()
+            for rows in chunks:
+                future = pool.submit(_classify_chunk, [(message_id, text) for message_id, text, _ in rows], rules_only)
+                in_flight.append((rows, future))
+                # Bounded read-ahead; results are written in id order for the checkpoint
+                if len(in_flight) >= workers * 2:
+                    done_rows, done = in_flight.popleft()
+                    write(done_rows, done.result())
+            while in_flight:
+                done_rows, done = in_flight.popleft()
+                write(done_rows, done.result())
+
+    elapsed = time.perf_counter() - start
+    if not dry_run:
+        save_checkpoint(checkpoint_path, dict(stats, fingerprint=fingerprint, last_id=last_id, completed=True))
+    result = dict(
+        stats,
+        last_id=last_id,
+        seconds=round(elapsed, 2),
+        msgs_per_sec=round(run_processed / elapsed) if elapsed else 0,
+        dry_run=dry_run
+    )
+    logger.info(f"Reclassification finished: {result['processed']} messages, {result['changed']} changed")
+    return result
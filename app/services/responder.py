@@ -7,6 +7,7 @@ from app.services.rag import rag_service
 from app.services.nlu import nlu_service
 from app.services.llm import llm_service
 from app.services.flows import flow_engine
+from app.services.text_norm import normalize_text
 from app.settings import config
 
 logger = structlog.get_logger()
@@ -27,6 +28,9 @@ class ResponseOrchestrator:
         
         logger.info(f"Processing message from {user_id} on {channel}: {text[:50]}...")
         
+        # Casefold, accent-fold and tokenize once; every stage below reads these forms
+        text = normalize_text(text)
+        
         # Check if user has an active flow
         if flow_engine.is_flow_active(user_id):
             return await self._handle_flow_message(user_id, text)
@@ -36,8 +40,8 @@ class ResponseOrchestrator:
         if flow_trigger:
             return flow_engine.start_flow(flow_trigger, user_id, channel)
         
-        # Perform RAG search
-        rag_results = rag_service.search(
+        # Perform RAG search off the event loop
+        rag_results = await rag_service.asearch(
             text,
             top_k=config.get("retrieval", {}).get("top_k", 4),
             min_score=config.get("retrieval", {}).get("min_score", 0.5)
@@ -60,11 +64,7 @@ class ResponseOrchestrator:
             "source": response_data.get("source", "unknown"),
             "rag_hits": len(rag_results),
             "rag_results": [
-                {
-                    "text": r["text"][:100] + "..." if len(r["text"]) > 100 else r["text"],
-                    "score": r["score"],
-                    "source": r["source"]
-                }
+                {"text": r.preview(100), "score": r.score, "source": r["source"]}
                 for r in rag_results[:3]
             ]
         }
@@ -81,7 +81,7 @@ class ResponseOrchestrator:
         """Handle message within an active flow"""
         
         # Check for flow cancellation
-        if text.lower() in ["cancelar", "cancel", "salir", "exit", "stop"]:
+        if normalize_text(text).folded in ["cancelar", "cancel", "salir", "exit", "stop"]:
             flow_engine.cancel_flow(user_id)
             return {
                 "reply": "Operación cancelada. ¿En qué más te puedo ayudar?",
@@ -93,11 +93,11 @@ class ResponseOrchestrator:
     
     def _check_flow_triggers(self, text: str) -> Optional[str]:
         """Check if message should trigger a flow"""
-        text_lower = text.lower()
+        text_folded = normalize_text(text).folded
         
         # Order flow triggers
         order_keywords = ["quiero", "ordenar", "pedido", "pedir", "comprar", "solicitar"]
-        if any(keyword in text_lower for keyword in order_keywords):
+        if any(keyword in text_folded for keyword in order_keywords):
             if config.get("orders", {}).get("enable", True):
                 return "quick_order"
         
@@ -0,0 +1,56 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+
+class SearchHit(Mapping):
+    """Read-only view of an indexed document with its search score
+
+    Holds a reference to the stored document instead of a copy; reads such as
+    hit["text"], hit["score"] or hit.get("metadata") work as they did on the dicts
+    search used to return. The document must not be mutated through the hit.
+    """
+
+    __slots__ = ("doc", "score", "extra")
+
+    def __init__(self, doc: Dict[str, Any], score: float, extra: Optional[Dict[str, float]] = None):
+        object.__setattr__(self, "doc", doc)
+        object.__setattr__(self, "score", float(score))
+        object.__setattr__(self, "extra", extra)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SearchHit is immutable")
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "score":
+            return self.score
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        return self.doc[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.doc
+        yield "score"
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(self.doc) + 1 + (len(self.extra) if self.extra else 0)
+
+    def __repr__(self) -> str:
+        return f"SearchHit(key={self.doc.get('key')!r}, score={self.score:.4f})"
+
+    @property
+    def id(self) -> int:
+        return self.doc["id"]
+
+    def preview(self, length: int = 100) -> str:
+        text = self.doc["text"]
+        return text[:length] + "..." if len(text) > length else text
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy, for JSON responses"""
+        data = dict(self.doc)
+        data["score"] = self.score
+        if self.extra:
+            data.update(self.extra)
+        return data
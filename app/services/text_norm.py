@@ -0,0 +1,57 @@
+import re
+import unicodedata
+from typing import Tuple
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+class _AccentTable(dict):
+    """str.translate table that decomposes each character the first time it is seen"""
+
+    def __missing__(self, code: int) -> str:
+        decomposed = unicodedata.normalize("NFKD", chr(code))
+        folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+        self[code] = folded
+        return folded
+
+
+_ACCENTS = _AccentTable()
+
+
+def strip_accents(text: str) -> str:
+    """Drop diacritics ("menú" -> "menu", "Ñ" -> "N"), keeping every other character"""
+    if text.isascii():
+        return text
+    return text.translate(_ACCENTS)
+
+
+def fold_text(text: str) -> str:
+    """Casefold, strip accents and collapse whitespace"""
+    return strip_accents(" ".join(text.casefold().split()))
+
+
+class NormalizedText(str):
+    """An incoming message (the str value, unchanged) with its normalized forms computed once
+
+    casefolded: casefolded with whitespace collapsed; keys the query caches and is
+        what the embedding model encodes, so accents still reach the encoder
+    folded: casefolded with accents stripped; what rules, keyword triggers, entity
+        matching and BM25 read, so "menu" and "menú" behave the same
+    tokens: the word tokens of folded
+    """
+
+    casefolded: str
+    folded: str
+    tokens: Tuple[str, ...]
+
+    def __new__(cls, text: str):
+        normalized = super().__new__(cls, text)
+        normalized.casefolded = " ".join(text.casefold().split())
+        normalized.folded = strip_accents(normalized.casefolded)
+        normalized.tokens = tuple(TOKEN_RE.findall(normalized.folded))
+        return normalized
+
+
+def normalize_text(text: str) -> NormalizedText:
+    """Normalize a message, or return it as is when it already was"""
+    return text if isinstance(text, NormalizedText) else NormalizedText(text)
@@ -0,0 +1,222 @@
+import os
+import math
+import numpy as np
+from typing import Any, Dict, Iterable, Optional, Set
+from pathlib import Path
+import structlog
+
+logger = structlog.get_logger()
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+STORAGE_TYPES = ("float32", "float16", "int8", "pq")
+
+
+def select_index_type(n: int, index_config: Dict[str, Any]) -> str:
+    """Pick the index type for a corpus of n vectors ("auto" chooses by size)"""
+    index_type = index_config.get("type", "auto")
+    if index_type in INDEX_TYPES:
+        return index_type
+    if index_type != "auto":
+        logger.warning(f"Unknown index type '{index_type}', choosing automatically")
+
+    if n <= index_config.get("flat_max", 50000):
+        return "flat"
+    if n <= index_config.get("hnsw_max", 1000000):
+        return "hnsw"
+    return "ivf"
+
+
+def empty_index(dimension: int):
+    """Exact inner-product index addressed by document id"""
+    import faiss
+    return faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))  # Inner product for cosine similarity
+
+
+def storage_type(index_config: Dict[str, Any]) -> str:
+    """Vector encoding inside the index; anything but float32 is lossy and re-ranked exactly"""
+    storage = index_config.get("storage", "float32")
+    if storage not in STORAGE_TYPES:
+        logger.warning(f"Unknown vector storage '{storage}', using float32")
+        return "float32"
+    return storage
+
+
+def _pq_subquantizers(dimension: int, index_config: Dict[str, Any]) -> int:
+    # Sub-quantizer count must divide the dimension; default to 8 dims per code byte
+    m = min(index_config.get("pq_m") or max(1, dimension // 8), dimension)
+    while dimension % m:
+        m -= 1
+    return m
+
+
+def build_index(embeddings: np.ndarray, ids: np.ndarray, index_config: Dict[str, Any], index_type: Optional[str] = None):
+    """Build and fill an index of the configured type from normalized embeddings"""
+    import faiss
+
+    n, dimension = embeddings.shape
+    index_type = index_type or select_index_type(n, index_config)
+    storage = storage_type(index_config)
+    if storage == "pq" and (n < 256 or index_type == "hnsw"):
+        # PQ needs 256+ training points, and HNSW has no inner-product PQ variant
+        logger.warning("Product quantization not usable here, falling back to int8")
+        storage = "int8"
+    sq_types = {"float16": faiss.ScalarQuantizer.QT_fp16, "int8": faiss.ScalarQuantizer.QT_8bit}
+
+    if index_type == "hnsw":
+        m = index_config.get("hnsw_m", 32)
+        if storage in sq_types:
+            hnsw = faiss.IndexHNSWSQ(dimension, sq_types[storage], m, faiss.METRIC_INNER_PRODUCT)
+        else:
+            hnsw = faiss.IndexHNSWFlat(dimension, m, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = index_config.get("ef_construction", 80)
+        index = faiss.IndexIDMap2(hnsw)
+    elif index_type == "ivf":
+        # IVF lists store ids natively, so no id map is needed
+        # k-means wants ~39 training points per list
+        nlist = index_config.get("ivf_nlist") or int(min(4 * math.sqrt(n), n / 39))
+        nlist = max(1, min(nlist, n))
+        quantizer = faiss.IndexFlatIP(dimension)
+        if storage in sq_types:
+            index = faiss.IndexIVFScalarQuantizer(
+                quantizer, dimension, nlist, sq_types[storage], faiss.METRIC_INNER_PRODUCT
+            )
+        elif storage == "pq":
+            index = faiss.IndexIVFPQ(
+                quantizer, dimension, nlist, _pq_subquantizers(dimension, index_config), 8, faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+    else:
+        if storage in sq_types:
+            codec = faiss.IndexScalarQuantizer(dimension, sq_types[storage], faiss.METRIC_INNER_PRODUCT)
+        elif storage == "pq":
+            codec = faiss.IndexPQ(dimension, _pq_subquantizers(dimension, index_config), 8, faiss.METRIC_INNER_PRODUCT)
+        else:
+            codec = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
+        index = faiss.IndexIDMap2(codec)
+
+    if not index.is_trained:
+        index.train(embeddings)
+    index.add_with_ids(embeddings, ids)
+    configure_search(index, index_config)
+    logger.info(f"Built {index_type} index ({storage}) with {n} vectors")
+    return index
+
+
+def configure_search(index, index_config: Dict[str, Any]):
+    """Apply search-time parameters (nprobe / efSearch) to an index of any type"""
+    import faiss
+
+    params = faiss.ParameterSpace()
+    kind = index_kind(index)
+    if kind == "ivf":
+        params.set_index_parameter(index, "nprobe", index_config.get("nprobe", 16))
+    elif kind == "hnsw":
+        params.set_index_parameter(index, "efSearch", index_config.get("ef_search", 64))
+
+
+def index_kind(index) -> str:
+    """Name of the index type behind any id-map wrapper"""
+    import faiss
+
+    inner = faiss.downcast_index(index.index) if hasattr(index, "id_map") else faiss.downcast_index(index)
+    if isinstance(inner, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(inner, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+
+def remove_ids(index, ids: np.ndarray) -> bool:
+    """Remove vectors by id; returns False when the index type cannot delete (HNSW)
+
+    Documents removed from an index that cannot delete are dropped from the
+    document map instead, and searches skip ids that no longer map to one.
+    """
+    try:
+        index.remove_ids(ids)
+        return True
+    except RuntimeError:
+        return False
+
+
+class ExactVectorStore:
+    """Full-precision vectors by id, used to re-rank candidates from a quantized index
+
+    Saved as exact_ids.npy (sorted) and exact_vectors.npy and memory-mapped on open, so
+    keeping them does not cost the resident memory that quantization saves. Vectors
+    upserted after opening live in an in-memory overlay until the next write.
+    """
+
+    IDS_FILE = "exact_ids.npy"
+    VECTORS_FILE = "exact_vectors.npy"
+
+    def __init__(self, ids: np.ndarray, vectors: np.ndarray):
+        self._ids = ids
+        self._vectors = vectors
+        self._overlay: Dict[int, np.ndarray] = {}
+        self._deleted: Set[int] = set()
+
+    @classmethod
+    def from_arrays(cls, ids: np.ndarray, vectors: np.ndarray) -> "ExactVectorStore":
+        order = np.argsort(ids, kind='stable')
+        return cls(np.asarray(ids, dtype='int64')[order], np.asarray(vectors, dtype='float32')[order])
+
+    @classmethod
+    def exists(cls, directory: Path) -> bool:
+        return (directory / cls.IDS_FILE).exists() and (directory / cls.VECTORS_FILE).exists()
+
+    @classmethod
+    def open(cls, directory: Path) -> "ExactVectorStore":
+        return cls(
+            np.load(directory / cls.IDS_FILE, mmap_mode='r'),
+            np.load(directory / cls.VECTORS_FILE, mmap_mode='r')
+        )
+
+    def write(self, directory: Path):
+        # Table rows that were deleted or replaced by the overlay are dropped
+        changed = np.fromiter(self._deleted | set(self._overlay), dtype='int64')
+        keep = ~np.isin(self._ids, changed)
+        ids = np.asarray(self._ids)[keep]
+        vectors = np.asarray(self._vectors)[keep]
+        if self._overlay:
+            extra_ids = np.fromiter(self._overlay.keys(), dtype='int64', count=len(self._overlay))
+            extra = np.vstack(list(self._overlay.values())).astype('float32')
+            ids = np.concatenate([ids, extra_ids])
+            vectors = np.vstack([vectors, extra]) if len(ids) > len(extra_ids) else extra
+        order = np.argsort(ids, kind='stable')
+
+        tmp_ids = directory / ("tmp." + self.IDS_FILE)
+        tmp_vectors = directory / ("tmp." + self.VECTORS_FILE)
+        np.save(tmp_ids, ids[order])
+        np.save(tmp_vectors, vectors[order])
+        os.replace(tmp_ids, directory / self.IDS_FILE)
+        os.replace(tmp_vectors, directory / self.VECTORS_FILE)
+
+    def copy(self) -> "ExactVectorStore":
+        """An independent store sharing the mapped arrays, for writing while this one changes"""
+        store = ExactVectorStore(self._ids, self._vectors)
+        store._overlay = dict(self._overlay)
+        store._deleted = set(self._deleted)
+        return store
+
+    def update(self, ids: Iterable[int], vectors: np.ndarray):
+        for doc_id, vector in zip(ids, vectors):
+            self._overlay[int(doc_id)] = np.array(vector, dtype='float32')
+            self._deleted.discard(int(doc_id))
+
+    def remove(self, ids: Iterable[int]):
+        for doc_id in ids:
+            self._overlay.pop(int(doc_id), None)
+            self._deleted.add(int(doc_id))
+
+    def get(self, doc_id: int) -> Optional[np.ndarray]:
+        doc_id = int(doc_id)
+        if doc_id in self._overlay:
+            return self._overlay[doc_id]
+        if doc_id in self._deleted:
+            return None
+        pos = int(np.searchsorted(self._ids, doc_id))
+        if pos < len(self._ids) and self._ids[pos] == doc_id:
+            return self._vectors[pos]
+        return None
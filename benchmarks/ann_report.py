@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Recall-vs-latency report for the approximate index types against the exact flat index.
+
+Usage:
+    python -m benchmarks.ann_report                      # vectors from faiss_index/embedding_cache
+    python -m benchmarks.ann_report --synthetic 200000   # random unit vectors
+    python -m benchmarks.ann_report --json ann_report.json
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from pathlib import Path
+
+from app.services import vector_index
+
+
+def load_vectors(args) -> np.ndarray:
+    import faiss
+
+    if args.synthetic:
+        rng = np.random.default_rng(args.seed)
+        vectors = rng.standard_normal((args.synthetic, args.dim)).astype('float32')
+    else:
+        vectors = np.load(args.vectors).astype('float32')
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def make_queries(vectors: np.ndarray, count: int, seed: int) -> np.ndarray:
+    """Perturbed corpus vectors, so each query has a realistic neighbourhood"""
+    import faiss
+
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), size=min(count, len(vectors)), replace=False)
+    queries = vectors[picks] + 0.05 * rng.standard_normal((len(picks), vectors.shape[1])).astype('float32')
+    queries = np.ascontiguousarray(queries, dtype='float32')
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def measure(index, queries: np.ndarray, k: int):
+    """Search one query at a time, as the chat path does, and time each call"""
+    latencies = []
+    ids = np.empty((len(queries), k), dtype='int64')
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, row_ids = index.search(queries[i:i + 1], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids[i] = row_ids[0]
+    return ids, np.array(latencies)
+
+
+def recall_at_k(approx: np.ndarray, exact: np.ndarray) -> float:
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approx, exact))
+    return hits / exact.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", default="faiss_index/embedding_cache/vectors.npy")
+    parser.add_argument("--synthetic", type=int, default=0, help="use N random vectors instead")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    vectors = load_vectors(args)
+    queries = make_queries(vectors, args.queries, args.seed)
+    ids = np.arange(len(vectors), dtype='int64')
+    k = min(args.k, len(vectors))
+    print(f"Corpus: {len(vectors)} vectors, dim {vectors.shape[1]}; {len(queries)} queries, k={k}")
+
+    candidates = [("flat", {}, {})]
+    candidates += [("hnsw", {"ef_search": ef}, {"ef_search": ef}) for ef in (16, 32, 64, 128, 256)]
+    candidates += [("ivf", {"nprobe": nprobe}, {"nprobe": nprobe}) for nprobe in (1, 4, 8, 16, 32, 64)]
+
+    results = []
+    built = {}
+    exact = None
+    for index_type, search_config, params in candidates:
+        if index_type not in built:
+            start = time.perf_counter()
+            built[index_type] = vector_index.build_index(vectors, ids, {}, index_type=index_type)
+            build_seconds = time.perf_counter() - start
+        else:
+            build_seconds = 0.0
+        index = built[index_type]
+        vector_index.configure_search(index, search_config)
+
+        found, latencies = measure(index, queries, k)
+        if exact is None:
+            exact = found
+        results.append({
+            "index_type": index_type,
+            "params": params,
+            "recall_at_k": round(recall_at_k(found, exact), 4),
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3),
+            "build_seconds": round(build_seconds, 2)
+        })
+
+    print(f"\n{'index':<6} {'params':<18} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8} {'build s':>8}")
+    for row in results:
+        params = ", ".join(f"{key}={value}" for key, value in row["params"].items()) or "-"
+        print(f"{row['index_type']:<6} {params:<18} {row['recall_at_k']:>9.4f} "
+              f"{row['latency_ms_p50']:>8.3f} {row['latency_ms_p95']:>8.3f} {row['build_seconds']:>8.2f}")
+
+    if args.json:
+        report = {"corpus_size": len(vectors), "dimension": int(vectors.shape[1]), "k": k, "results": results}
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
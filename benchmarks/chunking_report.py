@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Chunk statistics of the word-window and sentence chunkers on the same documents.
+
+For each strategy: chunk count, chunks over the model's token limit, tokens the
+encoder actually sees, tokens silently truncated away, and the share of each
+document's text that reaches the encoder at all. With --encode it also times
+embedding the chunks with the configured backend.
+
+Usage:
+    python -m benchmarks.chunking_report                      # files in data/docs
+    python -m benchmarks.chunking_report manual.pdf notes.md
+    python -m benchmarks.chunking_report --encode --json chunking_report.json
+"""
+
+import json
+import time
+import argparse
+from pathlib import Path
+
+from app.services.chunker import chunk_stream, token_counter, SPECIAL_TOKENS
+from app.services.ingest import iter_pages
+from app.services.rag import rag_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--encode", action="store_true", help="also time embedding the chunks")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    files = args.files or [str(path) for path in sorted(Path("data/docs").glob("*")) if path.is_file()]
+    if not files:
+        parser.error("no documents given and data/docs is empty")
+    base = rag_service.chunking_config()
+    count = token_counter(base["model_name"])
+    limit = args.max_tokens - SPECIAL_TOKENS
+    source_tokens = sum(count(page) for path in files for page in iter_pages(path))
+
+    results = []
+    for strategy in ("words", "sentence"):
+        chunking = dict(base, strategy=strategy, max_tokens=args.max_tokens)
+        chunks = [chunk for path in files for chunk in chunk_stream(iter_pages(path), chunking)]
+        sizes = [count(chunk) for chunk in chunks]
+        seen = sum(min(size, limit) for size in sizes)
+        row = {
+            "strategy": strategy,
+            "chunks": len(chunks),
+            "over_limit": sum(size > limit for size in sizes),
+            "tokens_encoded": seen,
+            "tokens_truncated": sum(max(0, size - limit) for size in sizes),
+            # Overlap is counted once per copy, so coverage can exceed 1.0
+            "text_coverage": round(seen / source_tokens, 3) if source_tokens else 0.0
+        }
+        if args.encode and rag_service._init_model():
+            start = time.perf_counter()
+            for i in range(0, len(chunks), 64):
+                rag_service._encode(chunks[i:i + 64])
+            row["encode_seconds"] = round(time.perf_counter() - start, 3)
+        results.append(row)
+
+    print(f"{len(files)} documents, ~{source_tokens} tokens, limit {limit} tokens per chunk\n")
+    print(f"{'strategy':<9} {'chunks':>7} {'over':>6} {'encoded':>9} {'truncated':>10} {'coverage':>9} {'encode s':>9}")
+    for row in results:
+        print(f"{row['strategy']:<9} {row['chunks']:>7} {row['over_limit']:>6} {row['tokens_encoded']:>9} "
+              f"{row['tokens_truncated']:>10} {row['text_coverage']:>9} {row.get('encode_seconds', '-'):>9}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"files": files, "results": results}, indent=2))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Rows/sec of the CSV loaders before and after vectorization.
+
+Generates synthetic FAQ and menu CSVs, then times the previous iterrows() loaders
+against RAGService's chunked column-wise loaders, and the previous per-row FAQ
+upload against the bulk one (on an in-memory SQLite database).
+
+Usage:
+    python -m benchmarks.csv_loader_report --rows 50000
+    python -m benchmarks.csv_loader_report --rows 20000 --json csv_loader_report.json
+"""
+
+import csv
+import json
+import time
+import random
+import argparse
+import tempfile
+import pandas as pd
+from pathlib import Path
+
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.db.models import FAQ
+from app.db.repo import FAQRepo
+from app.services.knowledge_seed import faqs_from_csv
+from app.services.rag import rag_service, faq_key, product_key
+
+
+def legacy_load_faqs(csv_path: str):
+    documents = []
+    df = pd.read_csv(csv_path)
+    for _, row in df.iterrows():
+        documents.append({
+            "key": faq_key(row.get('id'), row['question']),
+            "text": f"Q: {row['question']}\nA: {row['answer']}",
+            "source": "faq",
+            "metadata": {"question": row['question'], "answer": row['answer'], "tags": row.get('tags', '')}
+        })
+    return documents
+
+
+def legacy_load_menu(csv_path: str):
+    documents = []
+    df = pd.read_csv(csv_path)
+    for _, row in df.iterrows():
+        if row.get('available', True):
+            text = f"Producto: {row['name']}\nPrecio: ${row['price']}"
+            if pd.notna(row.get('description')):
+                text += f"\nDescripción: {row['description']}"
+            if pd.notna(row.get('category')):
+                text += f"\nCategoría: {row['category']}"
+            documents.append({
+                "key": product_key(row.get('id'), row['name']),
+                "text": text,
+                "source": "menu",
+                "metadata": {
+                    "name": row['name'],
+                    "price": row['price'],
+                    "description": row.get('description', ''),
+                    "category": row.get('category', ''),
+                    "product_id": row.get('id', None)
+                }
+            })
+    return documents
+
+
+def legacy_upload(content: bytes, session: Session) -> int:
+    faq_repo = FAQRepo(session)
+    imported_count = 0
+    for row in csv.DictReader(content.decode('utf-8').splitlines()):
+        if row.get('question') and row.get('answer'):
+            faq_repo.create(FAQ(question=row['question'], answer=row['answer'], tags=row.get('tags', '')))
+            imported_count += 1
+    return imported_count
+
+
+def bulk_upload(content: bytes, session: Session) -> int:
+    return FAQRepo(session).create_many(faqs_from_csv(content))
+
+
+def write_csvs(directory: Path, rows: int, seed: int):
+    rng = random.Random(seed)
+    categories = ["pizza", "bebida", "postre", "entrada", None]
+    faqs = pd.DataFrame({
+        "question": [f"¿Pregunta número {i} sobre el servicio?" for i in range(rows)],
+        "answer": [f"Respuesta {i}: " + " ".join(rng.choice(["sí", "no", "pronto", "hoy"]) for _ in range(12)) for i in range(rows)],
+        "tags": [rng.choice(["horarios", "envio,pago", ""]) for _ in range(rows)]
+    })
+    menu = pd.DataFrame({
+        "id": range(1, rows + 1),
+        "name": [f"Producto {i}" for i in range(rows)],
+        "price": [round(rng.uniform(1, 40), 2) for _ in range(rows)],
+        "description": [rng.choice([f"Descripción del producto {i}", None]) for i in range(rows)],
+        "category": [rng.choice(categories) for _ in range(rows)],
+        "available": [rng.random() > 0.1 for _ in range(rows)]
+    })
+    faqs.to_csv(directory / "faqs.csv", index=False)
+    menu.to_csv(directory / "menu.csv", index=False)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def comparable(documents):
+    # NaN != NaN, so compare through JSON where both sides render it the same way
+    return json.dumps(documents, ensure_ascii=False, default=str)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--upload-rows", type=int, default=5000, help="rows for the per-row vs bulk DB upload")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        write_csvs(directory, args.rows, args.seed)
+        faq_csv, menu_csv = str(directory / "faqs.csv"), str(directory / "menu.csv")
+
+        for name, before, after, path in (
+            ("faqs", legacy_load_faqs, rag_service.load_faqs_from_csv, faq_csv),
+            ("menu", legacy_load_menu, rag_service.load_menu_from_csv, menu_csv)
+        ):
+            old_docs, old_time = timed(before, path)
+            new_docs, new_time = timed(after, path)
+            results.append({
+                "loader": name,
+                "rows": args.rows,
+                "before_rows_per_sec": round(args.rows / old_time),
+                "after_rows_per_sec": round(args.rows / new_time),
+                "speedup": round(old_time / new_time, 1),
+                "identical_output": comparable(old_docs) == comparable(new_docs)
+            })
+
+        write_csvs(directory, args.upload_rows, args.seed)
+        content = (directory / "faqs.csv").read_bytes()
+        for name, upload in (("upload_before", legacy_upload), ("upload_after", bulk_upload)):
+            engine = create_engine("sqlite://")
+            SQLModel.metadata.create_all(engine)
+            with Session(engine) as session:
+                count, elapsed = timed(upload, content, session)
+            results.append({"loader": name, "rows": count, "rows_per_sec": round(count / elapsed)})
+
+    print(f"{'loader':<14} {'rows':>8} {'before r/s':>12} {'after r/s':>12} {'speedup':>8} {'same':>5}")
+    for row in results[:2]:
+        print(f"{row['loader']:<14} {row['rows']:>8} {row['before_rows_per_sec']:>12} {row['after_rows_per_sec']:>12} "
+              f"{row['speedup']:>7}x {str(row['identical_output']):>5}")
+    before, after = results[2], results[3]
+    print(f"{'faq upload':<14} {after['rows']:>8} {before['rows_per_sec']:>12} {after['rows_per_sec']:>12} "
+          f"{after['rows_per_sec'] / before['rows_per_sec']:>7.1f}x")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"results": results}, indent=2))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
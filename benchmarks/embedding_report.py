@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Parity and latency of an embedding backend against the PyTorch encoder.
+
+Encodes the knowledge-base texts plus sample queries with the reference (torch,
+float32) model and with the candidate backend, checks that every pair of embeddings
+has cosine similarity >= --min-cosine and that queries retrieve the same top
+document, then times per-query (batch of 1) and per-batch encode latency.
+Exits with status 1 when the parity check fails, so it can gate a config change.
+
+Usage:
+    python -m benchmarks.embedding_report --backend onnx
+    python -m benchmarks.embedding_report --backend onnx --quantize int8 --threads 4
+    python -m benchmarks.embedding_report --backend torch --quantize int8 --json embedding_report.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from app.services.embedding_backend import load_embedding_model
+
+QUERIES = [
+    "¿A qué hora abren?",
+    "¿Hacen envíos a domicilio?",
+    "Quiero una pizza grande de pepperoni",
+    "¿Cuánto cuesta la pizza margherita?",
+    "¿Aceptan tarjeta de crédito?",
+    "¿Tienen opciones vegetarianas?",
+    "Mi pedido llegó frío",
+    "¿Dónde están ubicados?"
+]
+
+
+def corpus_texts(limit: int):
+    texts = []
+    if Path("data/faqs.csv").exists():
+        df = pd.read_csv("data/faqs.csv")
+        texts += ("Q: " + df['question'].astype(str) + "\nA: " + df['answer'].astype(str)).tolist()
+    if Path("data/menu.csv").exists():
+        df = pd.read_csv("data/menu.csv")
+        texts += ("Producto: " + df['name'].astype(str) + "\nDescripción: " + df['description'].astype(str)).tolist()
+    return texts[:limit] or QUERIES
+
+
+def encode(model, texts, batch_size=32):
+    embeddings = np.asarray(model.encode(texts, batch_size=batch_size, convert_to_tensor=False), dtype='float32')
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def latency(model, queries, corpus, batch_size, repeats):
+    encode(model, queries[:2])  # warm up
+    single = []
+    for _ in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            model.encode([query], convert_to_tensor=False)
+            single.append((time.perf_counter() - start) * 1000)
+    batch = (corpus * (batch_size // max(1, len(corpus)) + 1))[:batch_size]
+    batched = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.encode(batch, batch_size=batch_size, convert_to_tensor=False)
+        batched.append((time.perf_counter() - start) * 1000)
+    return {
+        "query_ms_p50": round(float(np.percentile(single, 50)), 2),
+        "query_ms_p95": round(float(np.percentile(single, 95)), 2),
+        "batch_size": batch_size,
+        "batch_ms_p50": round(float(np.percentile(batched, 50)), 2),
+        "texts_per_sec": round(batch_size / (np.median(batched) / 1000))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backend", default="onnx", choices=["torch", "onnx"])
+    parser.add_argument("--quantize", default="none", choices=["none", "int8"])
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--onnx-file", default="")
+    parser.add_argument("--texts", type=int, default=200, help="corpus texts used for the parity check")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    reference = load_embedding_model(args.model, {"backend": "torch", "threads": args.threads})
+    candidate = load_embedding_model(args.model, {
+        "backend": args.backend, "quantize": args.quantize, "threads": args.threads, "onnx_file": args.onnx_file
+    })
+
+    corpus = corpus_texts(args.texts)
+    texts = corpus + QUERIES
+    ref, cand = encode(reference, texts), encode(candidate, texts)
+    cosine = np.sum(ref * cand, axis=1)
+    # Same nearest corpus document for each query under both encoders
+    ref_top = np.argmax(ref[len(corpus):] @ ref[:len(corpus)].T, axis=1)
+    cand_top = np.argmax(cand[len(corpus):] @ cand[:len(corpus)].T, axis=1)
+    parity = {
+        "texts": len(texts),
+        "cosine_min": round(float(cosine.min()), 5),
+        "cosine_mean": round(float(cosine.mean()), 5),
+        "top1_agreement": round(float(np.mean(ref_top == cand_top)), 3),
+        "passed": bool(cosine.min() >= args.min_cosine)
+    }
+
+    timings = {
+        "torch-none": latency(reference, QUERIES, corpus, args.batch_size, args.repeats),
+        f"{args.backend}-{args.quantize}": latency(candidate, QUERIES, corpus, args.batch_size, args.repeats)
+    }
+
+    print(f"Parity ({args.backend}, {args.quantize}) vs torch over {parity['texts']} texts: "
+          f"cosine min {parity['cosine_min']}, mean {parity['cosine_mean']}, "
+          f"top-1 agreement {parity['top1_agreement']:.0%} -> {'PASS' if parity['passed'] else 'FAIL'}")
+    print(f"\n{'backend':<14} {'query p50':>10} {'query p95':>10} {'batch p50':>10} {'texts/s':>9}")
+    for name, row in timings.items():
+        print(f"{name:<14} {row['query_ms_p50']:>10} {row['query_ms_p95']:>10} {row['batch_ms_p50']:>10} {row['texts_per_sec']:>9}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"parity": parity, "latency_ms": timings}, indent=2))
+        print(f"\nWrote {args.json}")
+    sys.exit(0 if parity["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Messages/sec of intent detection + confidence, re.search per call vs NLUService's rules.
+
+Runs a set of customer-style messages through the previous implementation (each
+rule pattern passed to re.search, then the winner's patterns searched again for
+confidence) and through NLUService (precompiled patterns, the winner's match count
+kept for the confidence call), and checks that both agree on intent and confidence.
+
+Usage:
+    python -m benchmarks.nlu_report
+    python -m benchmarks.nlu_report --messages 20000 --json nlu_report.json
+"""
+
+import re
+import json
+import time
+import random
+import logging
+import argparse
+from pathlib import Path
+
+import structlog
+
+from app.services.nlu import NLUService
+from app.services.text_norm import normalize_text
+
+SAMPLES = [
+    "Hola, buenas tardes",
+    "¿A qué hora abren el domingo?",
+    "¿Dónde están ubicados?",
+    "Quiero pedir dos pizzas para llevar",
+    "¿Cuánto cuesta la hamburguesa clásica?",
+    "¿Tienen promociones hoy?",
+    "Mi pedido tardó demasiado, es un problema",
+    "Gracias, hasta luego",
+    "¿Aceptan tarjeta o solo efectivo?",
+    "¿Qué tienen de postre?",
+    "El delivery llegó frío y la comida estaba mala",
+    "¿Me recomiendan algo vegetariano?",
+    "ok",
+    "Necesito hablar con alguien sobre mi factura"
+]
+
+
+def legacy_detect(rules, text):
+    text_lower = text.lower()
+    for intent, patterns in rules.items():
+        for pattern in patterns:
+            if re.search(pattern, text_lower, re.IGNORECASE):
+                return intent
+    return "unknown"
+
+
+def legacy_confidence(rules, text, intent):
+    if intent == "unknown":
+        return 0.1
+    text_lower = text.lower()
+    patterns = rules.get(intent, [])
+    matches = sum(1 for pattern in patterns if re.search(pattern, text_lower, re.IGNORECASE))
+    if not patterns:
+        return 0.5
+    confidence = matches / len(patterns)
+    return min(1.0, confidence + 0.3) if matches else confidence
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    # Per-message debug lines would dominate the timing
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.INFO))
+
+    rng = random.Random(args.seed)
+    # Distinct texts, so the remembered last scan only serves the confidence call
+    messages = [f"{rng.choice(SAMPLES)} {i}" for i in range(args.messages)]
+    # The responder normalizes each message once for the whole pipeline, before NLU sees it
+    normalized = [normalize_text(text) for text in messages]
+    nlu = NLUService()
+    rules = nlu.intent_rules
+
+    start = time.perf_counter()
+    before = []
+    for text in messages:
+        intent = legacy_detect(rules, text)
+        before.append((intent, legacy_confidence(rules, text, intent)))
+    before_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    after = []
+    for text in normalized:
+        intent = nlu.detect_intent(text)
+        after.append((intent, nlu.get_confidence_score(text, intent)))
+    after_seconds = time.perf_counter() - start
+
+    intent_agreement = sum(a[0] == b[0] for a, b in zip(after, before)) / len(messages)
+    confidence_agreement = sum(abs(a[1] - b[1]) < 1e-9 for a, b in zip(after, before)) / len(messages)
+    result = {
+        "messages": len(messages),
+        "patterns": sum(len(patterns) for patterns in rules.values()),
+        "before_msgs_per_sec": round(len(messages) / before_seconds),
+        "after_msgs_per_sec": round(len(messages) / after_seconds),
+        "speedup": round(before_seconds / after_seconds, 2),
+        "intent_agreement": round(intent_agreement, 4),
+        "confidence_agreement": round(confidence_agreement, 4)
+    }
+
+    print(f"{result['messages']} messages, {result['patterns']} patterns")
+    print(f"re.search per call:    {result['before_msgs_per_sec']:>8} msgs/s")
+    print(f"precompiled rules:     {result['after_msgs_per_sec']:>8} msgs/s  ({result['speedup']}x)")
+    print(f"agreement: intent {result['intent_agreement']:.2%}, confidence {result['confidence_agreement']:.2%}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Product mention extraction throughput as the catalog grows.
+
+Builds synthetic catalogs of increasing size and times ProductCatalogMatcher
+(one pass over the message) against a naive scan that checks every catalog
+term with `in`, the way the old hardcoded list was matched.
+
+Usage:
+    python -m benchmarks.product_matcher_report
+    python -m benchmarks.product_matcher_report --sizes 100 1000 10000 --json matcher_report.json
+"""
+
+import json
+import time
+import random
+import logging
+import argparse
+from pathlib import Path
+
+import structlog
+
+from app.db.models import Product
+from app.services.product_matcher import ProductCatalogMatcher, product_terms
+from app.services.text_norm import fold_text
+
+WORDS = [
+    "pizza", "hamburguesa", "taco", "burrito", "quesadilla", "café", "refresco", "jugo",
+    "ensalada", "sopa", "helado", "pollo", "queso", "jamón", "piña", "albahaca", "picante",
+    "doble", "especial", "clásica", "grande", "mediana", "limón", "fresa", "chocolate"
+]
+MESSAGES = [
+    "Hola, quiero pedir {0} y {1} para llevar",
+    "¿Cuánto cuesta {0}?",
+    "Me da dos {0} por favor, y algo vegetariano",
+    "¿Tienen {0} sin cebolla? También quiero {1}"
+]
+
+
+def catalog(size, rng):
+    return [
+        Product(id=i, name=f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}", price=1.0,
+                category=rng.choice(WORDS), tags=",".join(rng.sample(WORDS, 2)))
+        for i in range(size)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.INFO))
+
+    rng = random.Random(args.seed)
+    results = []
+    for size in args.sizes:
+        products = catalog(size, rng)
+        messages = [
+            rng.choice(MESSAGES).format(*(p.name for p in rng.sample(products, 2)))
+            for _ in range(args.messages)
+        ]
+
+        matcher = ProductCatalogMatcher()
+        start = time.perf_counter()
+        matcher.load(products)
+        matcher.find("warmup")  # failure links are built on the first lookup
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = sum(len(matcher.find(message)) for message in messages)
+        automaton_seconds = time.perf_counter() - start
+
+        terms = {term for product in products for term in product_terms(product)}
+        naive_messages = messages[:max(1, args.messages * 100 // size)]
+        start = time.perf_counter()
+        for message in naive_messages:
+            folded = fold_text(message)
+            [term for term in terms if term in folded]
+        naive_seconds = time.perf_counter() - start
+
+        results.append({
+            "products": size,
+            "terms": len(terms),
+            "build_seconds": round(build_seconds, 3),
+            "automaton_msgs_per_sec": round(len(messages) / automaton_seconds),
+            "naive_msgs_per_sec": round(len(naive_messages) / naive_seconds),
+            "mentions_per_msg": round(found / len(messages), 2)
+        })
+
+    print(f"{'products':>9} {'terms':>7} {'build s':>8} {'automaton/s':>12} {'naive/s':>9} {'mentions':>9}")
+    for row in results:
+        print(f"{row['products']:>9} {row['terms']:>7} {row['build_seconds']:>8} {row['automaton_msgs_per_sec']:>12} "
+              f"{row['naive_msgs_per_sec']:>9} {row['mentions_per_msg']:>9}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Memory and recall report for compressed vector storage against the float32 flat index.
+
+For each storage type the report lists index size, recall@k of the compressed scores
+alone and after exact re-ranking (what RAGService serves), and per-query latency.
+
+Usage:
+    python -m benchmarks.quantization_report                      # cached corpus embeddings
+    python -m benchmarks.quantization_report --synthetic 100000   # random unit vectors
+    python -m benchmarks.quantization_report --json quantization_report.json
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from pathlib import Path
+
+from app.services import vector_index
+from benchmarks.ann_report import load_vectors, make_queries, recall_at_k
+
+
+def index_bytes(index) -> int:
+    import faiss
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", default="faiss_index/embedding_cache/vectors.npy")
+    parser.add_argument("--synthetic", type=int, default=0, help="use N random vectors instead")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    vectors = load_vectors(args)
+    queries = make_queries(vectors, args.queries, args.seed)
+    ids = np.arange(len(vectors), dtype='int64')
+    k = min(args.k, len(vectors))
+    exact_store = vector_index.ExactVectorStore.from_arrays(ids, vectors)
+    print(f"Corpus: {len(vectors)} vectors, dim {vectors.shape[1]}; {len(queries)} queries, k={k}")
+
+    results = []
+    baseline = None
+    exact_ids = None
+    for storage in vector_index.STORAGE_TYPES:
+        index = vector_index.build_index(vectors, ids, {"storage": storage}, index_type="flat")
+        size = index_bytes(index)
+        fetch = k if storage == "float32" else k * args.rerank_factor
+
+        latencies = []
+        raw = np.empty((len(queries), k), dtype='int64')
+        reranked = np.empty((len(queries), k), dtype='int64')
+        for i in range(len(queries)):
+            query = queries[i:i + 1]
+            start = time.perf_counter()
+            _, candidates = index.search(query, fetch)
+            if storage != "float32":
+                scores = np.array([np.dot(exact_store.get(c), query[0]) if c >= 0 else -np.inf for c in candidates[0]])
+                best = candidates[0][np.argsort(-scores, kind='stable')][:k]
+            else:
+                best = candidates[0][:k]
+            latencies.append((time.perf_counter() - start) * 1000)
+            raw[i] = candidates[0][:k]
+            reranked[i] = best
+
+        if exact_ids is None:
+            exact_ids = reranked
+            baseline = size
+        latencies = np.array(latencies)
+        results.append({
+            "storage": storage,
+            "index_bytes": size,
+            "bytes_per_vector": round(size / len(vectors), 1),
+            "memory_saving": round(1 - size / baseline, 3),
+            "recall_at_k_compressed": round(recall_at_k(raw, exact_ids), 4),
+            "recall_at_k_reranked": round(recall_at_k(reranked, exact_ids), 4),
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3)
+        })
+
+    print(f"\n{'storage':<8} {'MB':>8} {'B/vec':>7} {'saving':>7} {'recall':>7} {'rerank':>7} {'p50 ms':>7} {'p95 ms':>7}")
+    for row in results:
+        print(f"{row['storage']:<8} {row['index_bytes'] / 1e6:>8.2f} {row['bytes_per_vector']:>7.1f} "
+              f"{row['memory_saving']:>7.1%} {row['recall_at_k_compressed']:>7.4f} {row['recall_at_k_reranked']:>7.4f} "
+              f"{row['latency_ms_p50']:>7.3f} {row['latency_ms_p95']:>7.3f}")
+    print("\nRe-ranking reads full-precision vectors from a memory-mapped file, which is not resident per worker.")
+
+    if args.json:
+        report = {"corpus_size": len(vectors), "dimension": int(vectors.shape[1]), "k": k,
+                  "rerank_factor": args.rerank_factor, "results": results}
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Retrieval quality and latency over a labelled query set.
+
+Each line of the query file is JSON with a "query" and the FAQ question(s) and/or
+product name(s) it should retrieve ("faq" / "product", a string or a list). Every
+query runs through RAGService.search (the configured dense or hybrid path) and
+through the BM25 keyword fallback, and the report gives recall@k, MRR and
+p50/p95/p99 latency for each, together with the settings that produced them.
+
+Usage:
+    python -m benchmarks.retrieval_report
+    python -m benchmarks.retrieval_report --rebuild --json runs/chunk300.json
+    python -m benchmarks.retrieval_report --k 8 --min-score 0.3 --warm
+"""
+
+import json
+import time
+import argparse
+import subprocess
+import numpy as np
+from pathlib import Path
+from datetime import datetime
+
+from app.settings import config
+from app.services import vector_index
+from app.services.rag import rag_service
+
+DEFAULT_QUERIES = Path(__file__).parent / "data" / "retrieval_queries.jsonl"
+
+
+def load_queries(path: Path):
+    """Labelled queries from the file, and the line numbers of those without a query or label"""
+    queries, skipped = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            labelled = json.loads(line)
+            if labelled.get("query") and expected_items(labelled):
+                queries.append(labelled)
+            else:
+                skipped.append(number)
+    return queries, skipped
+
+
+def expected_items(labelled: dict) -> set:
+    items = set()
+    for field, source in (("faq", "faq"), ("product", "menu")):
+        values = labelled.get(field, [])
+        for value in [values] if isinstance(values, str) else values:
+            if value:
+                items.add((source, value))
+    return items
+
+
+def hit_item(hit: dict):
+    metadata = hit.get("metadata", {})
+    if hit.get("source") == "faq":
+        return "faq", metadata.get("question")
+    if hit.get("source") == "menu":
+        return "menu", metadata.get("name")
+    return hit.get("source"), hit.get("key")
+
+
+def run(name: str, search, queries, k: int, repeats: int, warm: bool):
+    recalls, reciprocal_ranks, latencies, details = [], [], [], []
+    for labelled in queries:
+        expected = expected_items(labelled)
+        for _ in range(repeats):
+            if not warm:
+                rag_service._query_embeddings.clear()
+                rag_service._search_results.clear()
+            start = time.perf_counter()
+            hits = search(labelled["query"])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        ranked = [hit_item(hit) for hit in hits[:k]]
+        found = expected & set(ranked)
+        rank = next((i + 1 for i, item in enumerate(ranked) if item in expected), None)
+        recalls.append(len(found) / min(len(expected), k))
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+        details.append({"query": labelled["query"], "rank": rank, "top": [item[1] for item in ranked]})
+
+    return {
+        "method": name,
+        f"recall_at_{k}": round(float(np.mean(recalls)), 4),
+        "mrr": round(float(np.mean(reciprocal_ranks)), 4),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3),
+        "latency_ms_p99": round(float(np.percentile(latencies, 99)), 3),
+        "misses": [d for d in details if d["rank"] is None],
+        "queries": details
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    retrieval = config.get("retrieval", {})
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", default=str(DEFAULT_QUERIES))
+    parser.add_argument("--k", type=int, default=retrieval.get("top_k", 4))
+    parser.add_argument("--min-score", type=float, default=retrieval.get("min_score", 0.5))
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per query")
+    parser.add_argument("--warm", action="store_true", help="keep query caches between runs")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the index first (after changing chunk_size etc.)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        print(f"Rebuilt index: {rag_service.rebuild_index()}")
+    rag_service.warmup()
+    queries, skipped = load_queries(Path(args.queries))
+    if skipped:
+        print(f"Skipped {len(skipped)} queries without a query or an expected faq/product (lines {skipped})")
+    if not queries:
+        parser.error(f"no labelled queries in {args.queries}")
+    snapshot = rag_service._snapshot
+
+    results = [
+        run("search", lambda q: rag_service.search(q, top_k=args.k, min_score=args.min_score),
+            queries, args.k, args.repeats, args.warm),
+        run("keyword", lambda q: rag_service._simple_text_search(q, top_k=args.k),
+            queries, args.k, args.repeats, args.warm)
+    ]
+
+    print(f"{len(queries)} queries, k={args.k}, min_score={args.min_score}, mode={rag_service.retrieval_mode}, "
+          f"{len(snapshot.documents)} documents")
+    print(f"\n{'method':<8} {'recall@' + str(args.k):>9} {'MRR':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'misses':>7}")
+    for row in results:
+        print(f"{row['method']:<8} {row[f'recall_at_{args.k}']:>9.4f} {row['mrr']:>7.4f} {row['latency_ms_p50']:>8.3f} "
+              f"{row['latency_ms_p95']:>8.3f} {row['latency_ms_p99']:>8.3f} {len(row['misses']):>7}")
+
+    if args.json:
+        report = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "commit": git_commit(),
+            "settings": {
+                "k": args.k,
+                "min_score": args.min_score,
+                "mode": rag_service.retrieval_mode,
+                "chunk_size": retrieval.get("chunk_size", 300),
+                "index": rag_service.index_config,
+                "index_type": vector_index.index_kind(snapshot.index) if snapshot.index is not None else None,
+                "embedding": rag_service.embedding_config,
+                "documents": len(snapshot.documents),
+                "warm_cache": args.warm
+            },
+            "skipped_lines": skipped,
+            "results": results
+        }
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
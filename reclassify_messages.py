@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Re-detect the intent of stored user messages after intent rules or NLU settings change
+
+Usage:
+    python reclassify_messages.py                  # resumes an interrupted run if there is one
+    python reclassify_messages.py --rules-only --workers 8
+    python reclassify_messages.py --dry-run --restart
+"""
+
+import json
+import argparse
+
+from app.db.models import create_db_and_tables
+from app.services.reclassify import reclassify_messages, CHECKPOINT_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="messages per read/classify/update batch")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="classifier processes, 0 = one per CPU; each loads its own embedding model "
+                             "unless --rules-only")
+    parser.add_argument("--rules-only", action="store_true",
+                        help="regex rules only; messages no rule matches become 'unknown'")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing them")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start from the first message")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    result = reclassify_messages(
+        chunk_size=args.chunk_size,
+        workers=args.workers or None,
+        rules_only=args.rules_only,
+        dry_run=args.dry_run,
+        resume=not args.restart,
+        checkpoint_path=args.checkpoint
+    )
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from app.services.chunker import SPECIAL_TOKENS, estimate_tokens, iter_sentence_chunks
+
+
+def word_count(text: str) -> int:
+    return len(text.split())
+
+
+def document(rng: random.Random, words: int) -> str:
+    """Random paragraphs of random-length sentences over unique words"""
+    text, sentence = [], []
+    for i in range(words):
+        sentence.append(f"W{i}" if not sentence else f"w{i}")
+        if rng.random() < 0.12 or i == words - 1:
+            text.append(" ".join(sentence) + ".")
+            text.append("\n\n" if rng.random() < 0.25 else " ")
+            sentence = []
+    return "".join(text)
+
+
+def test_paragraph_cut_keeps_the_sentences_after_it():
+    text = "a1 a2 a3 a4 a5 a6 a7.\n\nB1 b2 b3 b4. C1 c2 c3 c4 c5 c6 c7 c8 c9 c10 c11 c12."
+    chunks = list(iter_sentence_chunks([text], max_tokens=16, count=word_count))
+    assert " ".join(chunks).split() == text.split()
+
+
+@pytest.mark.parametrize("count", [word_count, estimate_tokens])
+@pytest.mark.parametrize("max_tokens", [16, 64, 256])
+def test_chunks_reproduce_every_word(count, max_tokens):
+    rng = random.Random(max_tokens)
+    text = document(rng, 5000)
+    chunks = list(iter_sentence_chunks([text], max_tokens=max_tokens, count=count))
+    assert " ".join(chunks).split() == text.split()
+    assert all(count(chunk) <= max_tokens - SPECIAL_TOKENS for chunk in chunks)
+
+
+@pytest.mark.parametrize("max_tokens, overlap_tokens", [(16, 6), (64, 20), (256, 64)])
+def test_overlapping_chunks_cover_every_word_in_order(max_tokens, overlap_tokens):
+    rng = random.Random(max_tokens)
+    text = document(rng, 5000)
+    words = text.split()
+    position = {word: i for i, word in enumerate(words)}
+    chunks = list(iter_sentence_chunks([text], max_tokens, overlap_tokens, word_count))
+
+    covered, start = set(), -1
+    for chunk in chunks:
+        indexes = [position[word] for word in chunk.split()]
+        # Each chunk is a contiguous run of the input, starting after the previous one
+        assert indexes == list(range(indexes[0], indexes[0] + len(indexes)))
+        assert indexes[0] > start
+        assert len(indexes) <= max_tokens - SPECIAL_TOKENS
+        start = indexes[0]
+        covered.update(indexes)
+    assert covered == set(range(len(words)))
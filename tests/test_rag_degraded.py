@@ -0,0 +1,101 @@
+import zlib
+
+import numpy as np
+import pytest
+
+from app.services.docstore import DocStore
+from app.services.embedding_cache import EmbeddingCache
+from app.services.rag import RAGService, faq_key
+
+QUESTIONS = [
+    "pizza pepperoni grande",
+    "horario de atencion domingo",
+    "formas de pago tarjeta",
+    "delivery a domicilio zona norte",
+    "menu vegetariano ensaladas",
+]
+
+
+class FakeModel:
+    """Bag-of-words vectors, stable across processes"""
+
+    def encode(self, texts, convert_to_tensor=False, **kwargs):
+        vectors = np.full((len(texts), 64), 1e-3, dtype='float32')
+        for row, text in enumerate(texts):
+            for word in text.split():
+                vectors[row, zlib.crc32(word.encode()) % 64] += 1
+        return vectors
+
+
+def faq(faq_id, question):
+    return {
+        "text": f"Q: {question}\nA: {question}",
+        "source": "faq",
+        "metadata": {"faq_id": faq_id, "question": question},
+    }
+
+
+def service(path):
+    rag = RAGService()
+    rag.index_path = path
+    rag.documents_path = path / "documents.json"
+    rag.index_file = path / "index.faiss"
+    rag.legacy_lexical_path = path / "bm25.json"
+    rag.embedding_cache = EmbeddingCache(path / "embedding_cache", "fake")
+    rag.save_delay = 3600
+    rag.model = FakeModel()
+    return rag
+
+
+@pytest.fixture
+def damaged(tmp_path, monkeypatch):
+    """A service whose index.faiss could not be read, with every document still loaded"""
+    rag = service(tmp_path)
+    rag.upsert_documents([faq(i, question) for i, question in enumerate(QUESTIONS)])
+    rag.save_index()
+    rag.index_file.write_bytes(b"not a faiss index")
+
+    rag = service(tmp_path)
+    rebuilds = []
+    monkeypatch.setattr(rag, "start_rebuild", lambda: rebuilds.append(True))
+    rag.ensure_loaded()
+    assert rag.index is None and len(rag.documents) == len(QUESTIONS)
+    assert rag.warmup_error
+    return rag, rebuilds
+
+
+def test_upsert_without_vector_index_keeps_documents_and_rebuilds(damaged):
+    rag, rebuilds = damaged
+    rag.upsert_documents([faq(len(QUESTIONS), "promociones de martes")])
+
+    # No one-document index: the others would vanish from dense search
+    assert rag.index is None
+    assert len(rag.documents) == len(QUESTIONS) + 1
+    assert rebuilds
+    assert rag.search("pizza pepperoni", top_k=2, min_score=0.0)
+    assert rag._simple_text_search("promociones martes")
+
+    # Nothing covering only part of the documents reaches disk
+    rag.save_index()
+    assert rag.index_file.read_bytes() == b"not a faiss index"
+
+
+def test_remove_without_vector_index_drops_the_document(damaged):
+    rag, rebuilds = damaged
+    assert rag._simple_text_search("pizza pepperoni")
+
+    assert rag.remove_documents([faq_key(0, QUESTIONS[0])]) == 1
+    assert len(rag.documents) == len(QUESTIONS) - 1
+    assert not rag._simple_text_search("pizza pepperoni")
+    assert not rag.search("pizza pepperoni", top_k=2, min_score=0.0)
+    assert rebuilds
+
+
+def test_save_refuses_an_index_missing_documents(tmp_path):
+    rag = service(tmp_path)
+    rag.upsert_documents([faq(i, question) for i, question in enumerate(QUESTIONS)])
+    rag.save_index()
+
+    rag._snapshot.documents[12345] = faq(12345, "sin vector")
+    rag.save_index()
+    assert len(DocStore.open(tmp_path)) == len(QUESTIONS)